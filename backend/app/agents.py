@@ -1,15 +1,23 @@
+import asyncio
+import hashlib
 import json
 import logging
+import time
 from pathlib import Path
 
 from mistralai import Mistral
 
+from . import upstream
 from .config import settings
 from .tools import TOOL_SCHEMAS
 
 logger = logging.getLogger(__name__)
 
-_AGENT_IDS_FILE = Path(__file__).parent.parent / ".agent_ids.json"
+_AGENT_IDS_FILE = (
+    Path(settings.AGENT_IDS_FILE)
+    if settings.AGENT_IDS_FILE
+    else Path(__file__).parent.parent / ".agent_ids.json"
+)
 
 # ---------------------------------------------------------------------------
 # Module-level state — populated once at startup via setup_agents()
@@ -20,6 +28,11 @@ client: Mistral = None  # type: ignore[assignment]
 AGENTS: dict[str, str] = {}  # name → agent_id
 AGENT_ID_TO_NAME: dict[str, str] = {}  # agent_id → name
 
+# Stored IDs are trusted but not yet checked (AGENT_VERIFY_LAZY); the first
+# ensure_agents() call verifies them
+_verify_pending = False
+_verify_lock = asyncio.Lock()
+
 # Model used for all agents
 _MODEL = "mistral-medium-latest"
 
@@ -56,21 +69,23 @@ You will recognise this situation because the conversation will contain a synthe
 summary produced by the Synthesizer agent. Present that summary to the user in clear, \
 developer-friendly language. Be concise and direct. Do not add filler phrases."""
 
-_SCAVENGER_PROMPT = """You are a data retrieval agent. You are called exclusively when \
+_TOOL_NAMES = [tool["function"]["name"] for tool in TOOL_SCHEMAS]
+
+_SCAVENGER_PROMPT = f"""You are a data retrieval agent. You are called exclusively when \
 the Interface agent has determined that fresh data is needed to answer the user's question.
 
 ## Your job
 
-Call BOTH available tools — read_notion_mock and read_slack_mock — for every query, \
-regardless of what either returns. Use the user's original question as the search query \
-for both tools.
+Call ALL available tools — {", ".join(_TOOL_NAMES)} — for every query, regardless of what \
+any of them returns. Use the user's original question as the search query for every tool. \
+If the question is about a specific period, also pass it as since/until (YYYY-MM-DD).
 
 ## Rules
 
 - Do NOT summarise, interpret, or add any commentary to the tool results.
 - Do NOT attempt to answer the user's question yourself.
 - Return the raw tool output exactly as received.
-- Once both tools have been called, hand off immediately to the Synthesizer agent."""
+- Once every tool has been called, hand off immediately to the Synthesizer agent."""
 
 _SYNTHESIZER_PROMPT = """You are a synthesis agent. You are called after the Scavenger \
 agent has retrieved raw data from Notion and Slack.
@@ -93,6 +108,118 @@ will handle that.
 - Once your summary is written, hand off immediately to the Interface agent."""
 
 
+# ---------------------------------------------------------------------------
+# Agent ID persistence
+# ---------------------------------------------------------------------------
+
+_NAMES = ("scavenger", "synthesizer", "interface")
+
+
+def _config_hash() -> str:
+    """Fingerprint of everything agents are created from.
+
+    Stored next to the IDs, so editing a prompt or tool schema invalidates
+    the saved agents instead of silently reusing stale ones.
+    """
+    config = [_MODEL, _SCAVENGER_PROMPT, _SYNTHESIZER_PROMPT, _INTERFACE_PROMPT]
+    payload = json.dumps([config, TOOL_SCHEMAS], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _load_ids() -> tuple[dict[str, str], float] | None:
+    """Saved ``(ids, verified_at)``, or ``None`` if absent or stale."""
+    try:
+        saved = json.loads(_AGENT_IDS_FILE.read_text())
+    except (OSError, ValueError):
+        return None
+    if saved.get("config_hash", _config_hash()) != _config_hash():
+        logger.info("Agent configuration changed since the agents were created.")
+        return None
+    try:
+        ids = {name: saved[name] for name in _NAMES}
+    except KeyError:
+        return None
+    return ids, float(saved.get("verified_at", 0.0))
+
+
+def _save_ids(ids: dict[str, str]) -> None:
+    """Persist IDs so subsequent startups skip creation (and re-verification)."""
+    _AGENT_IDS_FILE.write_text(
+        json.dumps(
+            {**ids, "verified_at": time.time(), "config_hash": _config_hash()},
+            indent=2,
+        )
+    )
+
+
+def _use(ids: dict[str, str]) -> None:
+    AGENTS.clear()
+    AGENTS.update(ids)
+    AGENT_ID_TO_NAME.clear()
+    AGENT_ID_TO_NAME.update({v: k for k, v in ids.items()})
+
+
+async def _verify(ids: dict[str, str]) -> bool:
+    """Check that every stored ID still exists on Mistral (concurrently)."""
+    try:
+        await asyncio.gather(
+            *(client.beta.agents.get_async(agent_id=ids[name]) for name in _NAMES)
+        )
+    except Exception as exc:
+        logger.warning("Stored agent IDs invalid (%s). Creating new agents.", exc)
+        return False
+    return True
+
+
+async def _create() -> dict[str, str]:
+    """Create the three agents and wire their handoffs, concurrently."""
+    # 1. Scavenger has both tools; Synthesizer and Interface have none
+    scavenger, synthesizer, interface = await asyncio.gather(
+        client.beta.agents.create_async(
+            model=_MODEL,
+            name="Scavenger",
+            instructions=_SCAVENGER_PROMPT,
+            tools=TOOL_SCHEMAS,
+        ),
+        client.beta.agents.create_async(
+            model=_MODEL,
+            name="Synthesizer",
+            instructions=_SYNTHESIZER_PROMPT,
+            tools=[],
+        ),
+        client.beta.agents.create_async(
+            model=_MODEL,
+            name="Interface",
+            instructions=_INTERFACE_PROMPT,
+            tools=[],
+        ),
+    )
+    logger.info(
+        "Agents created — scavenger=%s  synthesizer=%s  interface=%s",
+        scavenger.id,
+        synthesizer.id,
+        interface.id,
+    )
+
+    # 2. Wire the circular handoff chain:
+    #    Interface → Scavenger → Synthesizer → Interface
+    await asyncio.gather(
+        client.beta.agents.update_async(agent_id=interface.id, handoffs=[scavenger.id]),
+        client.beta.agents.update_async(
+            agent_id=scavenger.id, handoffs=[synthesizer.id]
+        ),
+        client.beta.agents.update_async(
+            agent_id=synthesizer.id, handoffs=[interface.id]
+        ),
+    )
+
+    return {
+        "scavenger": scavenger.id,
+        "synthesizer": synthesizer.id,
+        "interface": interface.id,
+    }
+
+
 # ---------------------------------------------------------------------------
 # Startup function
 # ---------------------------------------------------------------------------
@@ -101,108 +228,72 @@ will handle that.
 async def setup_agents() -> None:
     """Create the three Mistral agents and wire their handoffs.
 
-    Idempotent: if `.agent_ids.json` exists and the stored IDs are still valid
-    on Mistral, the agents are reused and no new ones are created. New agents
-    are only created when the file is absent or the stored IDs have been deleted.
+    Idempotent: if `.agent_ids.json` holds IDs created from the current
+    prompts and tool schemas, they are reused:
+
+    - verified less than ``AGENT_VERIFY_TTL_SECONDS`` ago → used as-is, no
+      API calls at all;
+    - otherwise, with ``AGENT_VERIFY_LAZY`` → used as-is and verified by the
+      first :func:`ensure_agents` call;
+    - otherwise → verified now (all three concurrently).
+
+    New agents are only created when no valid IDs are stored. Creation and
+    handoff wiring are also issued concurrently.
 
     Called once from the FastAPI lifespan startup handler.
     """
-    global client
+    global client, _verify_pending
 
-    client = Mistral(api_key=settings.MISTRAL_API_KEY)
+    client = upstream.create_client()
 
     # --- Try to reuse previously created agents ---
-    if _AGENT_IDS_FILE.exists():
-        try:
-            saved = json.loads(_AGENT_IDS_FILE.read_text())
-            # Verify each ID is still alive on Mistral
-            for name in ("scavenger", "synthesizer", "interface"):
-                client.beta.agents.get(agent_id=saved[name])
-            # All valid — populate dicts and return early
-            AGENTS.update(saved)
-            AGENT_ID_TO_NAME.update({v: k for k, v in saved.items()})
-            logger.info(
-                "Reusing existing agents — scavenger=%s  synthesizer=%s  interface=%s",
-                saved["scavenger"],
-                saved["synthesizer"],
-                saved["interface"],
-            )
+    loaded = _load_ids()
+    if loaded is not None:
+        ids, verified_at = loaded
+        if time.time() - verified_at < settings.AGENT_VERIFY_TTL_SECONDS:
+            _use(ids)
+            logger.info("Reusing agents verified %.0fs ago.", time.time() - verified_at)
+            return
+        if settings.AGENT_VERIFY_LAZY:
+            _use(ids)
+            _verify_pending = True
+            logger.info("Reusing stored agents; verification deferred to first use.")
+            return
+        if await _verify(ids):
+            _use(ids)
+            _save_ids(ids)
+            logger.info("Reusing existing agents (verified).")
             return
-        except Exception as exc:
-            logger.warning("Stored agent IDs invalid (%s). Creating new agents.", exc)
-            _AGENT_IDS_FILE.unlink(missing_ok=True)
+        _AGENT_IDS_FILE.unlink(missing_ok=True)
 
     # --- Create fresh agents ---
+    ids = await _create()
+    _use(ids)
+    _save_ids(ids)
+    logger.info("All agents ready.")
 
-    # 1. Scavenger — has both tools
-    scavenger = client.beta.agents.create(
-        model=_MODEL,
-        name="Scavenger",
-        instructions=_SCAVENGER_PROMPT,
-        tools=TOOL_SCHEMAS,
-    )
-    logger.info("Scavenger agent created: %s", scavenger.id)
-
-    # 2. Synthesizer — no tools
-    synthesizer = client.beta.agents.create(
-        model=_MODEL,
-        name="Synthesizer",
-        instructions=_SYNTHESIZER_PROMPT,
-        tools=[],
-    )
-    logger.info("Synthesizer agent created: %s", synthesizer.id)
-
-    # 3. Interface — no tools, orchestrator and terminal agent
-    interface = client.beta.agents.create(
-        model=_MODEL,
-        name="Interface",
-        instructions=_INTERFACE_PROMPT,
-        tools=[],
-    )
-    logger.info("Interface agent created: %s", interface.id)
 
-    # 4. Wire handoffs: Interface → Scavenger (entry point delegates retrieval)
-    client.beta.agents.update(
-        agent_id=interface.id,
-        handoffs=[scavenger.id],
-    )
+async def ensure_agents() -> None:
+    """Run the verification deferred by ``AGENT_VERIFY_LAZY``, once.
 
-    # 5. Wire handoffs: Scavenger → Synthesizer
-    client.beta.agents.update(
-        agent_id=scavenger.id,
-        handoffs=[synthesizer.id],
-    )
-
-    # 6. Wire handoffs: Synthesizer → Interface (closes the loop)
-    client.beta.agents.update(
-        agent_id=synthesizer.id,
-        handoffs=[interface.id],
-    )
+    Cheap no-op once agents are verified; call before using :data:`AGENTS`.
+    If the stored agents turn out to be gone they are recreated.
+    """
+    global _verify_pending
 
-    # 7. Populate lookup dicts
-    AGENTS["scavenger"] = scavenger.id
-    AGENTS["synthesizer"] = synthesizer.id
-    AGENTS["interface"] = interface.id
+    if not _verify_pending:
+        return
+    async with _verify_lock:
+        if not _verify_pending:
+            return
+        ids = dict(AGENTS)
+        if not await _verify(ids):
+            ids = await _create()
+            _use(ids)
+        _save_ids(ids)
+        _verify_pending = False
 
-    AGENT_ID_TO_NAME[scavenger.id] = "scavenger"
-    AGENT_ID_TO_NAME[synthesizer.id] = "synthesizer"
-    AGENT_ID_TO_NAME[interface.id] = "interface"
 
-    # 8. Persist IDs so subsequent startups skip creation
-    _AGENT_IDS_FILE.write_text(
-        json.dumps(
-            {
-                "scavenger": scavenger.id,
-                "synthesizer": synthesizer.id,
-                "interface": interface.id,
-            },
-            indent=2,
-        )
-    )
-
-    logger.info(
-        "All agents ready — scavenger=%s  synthesizer=%s  interface=%s",
-        scavenger.id,
-        synthesizer.id,
-        interface.id,
-    )
+def agents_ready() -> bool:
+    """True once agent IDs are known (possibly pending lazy verification)."""
+    return len(AGENTS) == len(_NAMES)
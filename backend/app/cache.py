@@ -0,0 +1,125 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any
+
+from .index import tokenize
+from .storage import Storage
+
+# ---------------------------------------------------------------------------
+# Keys
+# ---------------------------------------------------------------------------
+
+
+def normalize_query(query: str) -> str:
+    """Reduce *query* to its sorted, de-duplicated index terms.
+
+    "What's the login spec?" and "login specs" normalise to the same string.
+    """
+    return " ".join(sorted(set(tokenize(query))))
+
+
+def make_key(*parts: str) -> str:
+    """Hash *parts* into a fixed-size cache key."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# LRU / TTL / byte-bounded cache
+# ---------------------------------------------------------------------------
+
+
+class LRUCache:
+    """In-memory string cache with LRU eviction, a TTL and a byte budget.
+
+    Callers key entries on everything a value was derived from (e.g. the
+    retrieved Notion/Slack passages), so a corpus update only retires the
+    entries whose inputs it actually changed; those age out via LRU/TTL.
+
+    If a shared *storage* backend is given it is used as a second tier under
+    *namespace*: misses fall through to it and puts are written through, so
+    worker processes share each other's results.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl_seconds: float,
+        storage: Storage | None = None,
+        namespace: str = "cache",
+    ) -> None:
+        self.storage = storage
+        self.namespace = namespace
+        if storage is not None:
+            storage.set_capacity(namespace, max_entries)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._entries: OrderedDict[str, tuple[float, int, str]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._drop(key)
+            value = self._shared_get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._put_local(key, value)
+            self.hits += 1
+            return value
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def put(self, key: str, value: str) -> None:
+        self._put_local(key, value)
+        if self.storage is not None:
+            self.storage.put(self.namespace, key, value, self.ttl_seconds)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _shared_get(self, key: str) -> str | None:
+        if self.storage is None:
+            return None
+        return self.storage.get(self.namespace, key)
+
+    def _put_local(self, key: str, value: str) -> None:
+        size = len(value.encode())
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
@@ -0,0 +1,109 @@
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+Emit = Callable[[str, dict[str, Any]], Awaitable[None]]
+
+
+# ---------------------------------------------------------------------------
+# Single-flight request coalescing
+# ---------------------------------------------------------------------------
+
+
+class _Flight(Generic[T]):
+    """One shared execution: its task plus every event it has emitted so far."""
+
+    def __init__(self) -> None:
+        self.task: asyncio.Task[T] | None = None
+        self.events: list[tuple[str, dict[str, Any]]] = []
+        self.waiters = 0
+        self._changed = asyncio.Event()
+
+    async def record(self, event_type: str, data: dict[str, Any]) -> None:
+        self.events.append((event_type, data))
+        self.notify()
+
+    def notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self) -> None:
+        await self._changed.wait()
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key starts ``fn(emit)`` as a task; callers arriving
+    while it is still running attach to it instead of starting their own. Every
+    attached caller receives all events the shared execution emits — including
+    those emitted before it attached — on its own *emit*, in order, and then
+    gets the shared result (or exception).
+
+    The shared task runs in a fresh :class:`contextvars.Context`, not the
+    first caller's: it must not inherit that caller's per-turn state (stage
+    timings, deadlines), so *fn* sets up its own, and each caller bounds and
+    times its wait in its own context.
+
+    The shared task is cancelled only once every attached caller has gone.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[str, _Flight[Any]] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def run(
+        self,
+        key: str,
+        fn: Callable[[Emit], Awaitable[T]],
+        emit: Emit,
+    ) -> T:
+        flight: _Flight[T] | None = self._flights.get(key)
+        if flight is None:
+            flight = self._start(key, fn)
+        else:
+            self.coalesced += 1
+
+        assert flight.task is not None
+        flight.waiters += 1
+        try:
+            delivered = 0
+            while True:
+                while delivered < len(flight.events):
+                    await emit(*flight.events[delivered])
+                    delivered += 1
+                if flight.task.done():
+                    break
+                await flight.wait()
+            return flight.task.result()
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                self._flights.pop(key, None)
+                flight.task.cancel()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "in_flight": len(self._flights),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
+
+    def _start(self, key: str, fn: Callable[[Emit], Awaitable[T]]) -> _Flight[T]:
+        flight: _Flight[T] = _Flight()
+
+        def finished(_: asyncio.Task[T]) -> None:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            flight.notify()
+
+        flight.task = asyncio.get_running_loop().create_task(
+            fn(flight.record), context=contextvars.Context()
+        )
+        flight.task.add_done_callback(finished)
+        self._flights[key] = flight
+        self.executions += 1
+        return flight
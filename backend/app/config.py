@@ -1,4 +1,5 @@
 import os
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -18,6 +19,149 @@ class Settings(BaseSettings):
     DEBUG: bool = STAGE == "local"
 
     MISTRAL_API_KEY: str = os.environ.get("MISTRAL_API_KEY", "")
+    # Override the Mistral API base URL (e.g. the loadtest fake server)
+    MISTRAL_SERVER_URL: str = ""
+    # Where agent IDs are persisted (default: backend/.agent_ids.json)
+    AGENT_IDS_FILE: str = ""
+    # Stored agent IDs verified within this window are reused without any
+    # API call; older ones are re-verified (at startup, or on first use when
+    # AGENT_VERIFY_LAZY is set)
+    AGENT_VERIFY_TTL_SECONDS: float = 24 * 3600.0
+    AGENT_VERIFY_LAZY: bool = False
+
+    # Source exports (default: data/mock_notion.json, data/mock_slack.json).
+    # They are polled every CORPUS_POLL_INTERVAL_SECONDS and changes are
+    # applied to the index incrementally (0 = load once at startup).
+    NOTION_DATA_PATH: str = ""
+    SLACK_DATA_PATH: str = ""
+    CORPUS_POLL_INTERVAL_SECONDS: float = 2.0
+
+    # Retrieval: documents are chunked into passages of at most
+    # PASSAGE_MAX_TOKENS; each tool returns its RETRIEVAL_TOP_K best passages,
+    # and the Synthesizer gets at most SYNTHESIS_INPUT_TOKEN_BUDGET tokens of
+    # them (deduplicated across sources)
+    RETRIEVAL_TOP_K: int = 5
+    PASSAGE_MAX_TOKENS: int = 128
+    SYNTHESIS_INPUT_TOKEN_BUDGET: int = 1500
+    # Dense retrieval (requires numpy): passages also get hashed TF-IDF
+    # vectors (DENSE_DIM wide, persisted next to the store) and tool
+    # searches fuse the dense and BM25 rankings; dense hits need a cosine
+    # similarity above DENSE_MIN_SCORE
+    RETRIEVAL_DENSE: bool = False
+    DENSE_DIM: int = 256
+    DENSE_MIN_SCORE: float = 0.2
+    # Each source connector searches on its own TOOL_MAX_WORKERS threads and
+    # must answer within TOOL_TIMEOUT_SECONDS; otherwise the turn goes on
+    # without that source's results
+    TOOL_TIMEOUT_SECONDS: float = 5.0
+    TOOL_MAX_WORKERS: int = 4
+    # Recency-weighted ranking: a passage RECENCY_HALF_LIFE_DAYS older than
+    # the newest candidate keeps 1 - RECENCY_WEIGHT/2 of its score (0 = off)
+    RECENCY_WEIGHT: float = 0.3
+    RECENCY_HALF_LIFE_DAYS: float = 30.0
+    # "direct": the orchestrator calls every tool itself, concurrently.
+    # "agent":  the Scavenger LLM decides which tools to call (slower).
+    RETRIEVAL_MODE: Literal["direct", "agent"] = "direct"
+
+    # Upstream (Mistral) HTTP client: keep-alive pool size and timeouts.
+    # Connection errors, timeouts, 429s and 5xx responses are retried up to
+    # UPSTREAM_MAX_RETRIES times with jittered exponential backoff (streams
+    # only until established)
+    UPSTREAM_MAX_CONNECTIONS: int = 100
+    UPSTREAM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    UPSTREAM_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    UPSTREAM_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    UPSTREAM_READ_TIMEOUT_SECONDS: float = 60.0
+    UPSTREAM_MAX_RETRIES: int = 2
+    UPSTREAM_RETRY_BACKOFF_SECONDS: float = 0.5
+    # Hedge non-streamed Synthesizer calls: send a second request when the
+    # first is slower than the p95 of recent calls (and at least
+    # UPSTREAM_HEDGE_MIN_DELAY_SECONDS); the first answer wins
+    UPSTREAM_HEDGE_ENABLED: bool = False
+    UPSTREAM_HEDGE_MIN_DELAY_SECONDS: float = 1.0
+    # Deadlines (s) for a whole turn and for each stage within it; upstream
+    # read timeouts are capped at the time left
+    TURN_DEADLINE_SECONDS: float = 120.0
+    SCAVENGER_DEADLINE_SECONDS: float = 30.0
+    SYNTHESIZER_DEADLINE_SECONDS: float = 60.0
+    INTERFACE_DEADLINE_SECONDS: float = 60.0
+
+    # Speculative retrieval for drafts posted to /prefetch while the user
+    # types (direct retrieval mode only): results are kept for
+    # PREFETCH_TTL_SECONDS for the turn that follows; at most
+    # PREFETCH_MAX_INFLIGHT run at once, one per session; drafts with fewer
+    # than PREFETCH_MIN_TERMS index terms are ignored
+    PREFETCH_ENABLED: bool = True
+    PREFETCH_TTL_SECONDS: float = 30.0
+    PREFETCH_MAX_ENTRIES: int = 256
+    PREFETCH_MAX_INFLIGHT: int = 8
+    PREFETCH_MIN_TERMS: int = 2
+
+    # Router: decide per turn whether to retrieve (Path B) or answer from the
+    # conversation (Path A). Disabled → retrieve only on a session's first turn.
+    ROUTER_ENABLED: bool = True
+    # Retrieve when the share of message terms already in the conversation
+    # (adjusted by follow-up / data-request cues) is below this
+    ROUTER_COVERAGE_THRESHOLD: float = 0.6
+
+    # Precomputed Source of Truth summaries for topics present in both Notion
+    # and Slack, refreshed in the background when the corpus changes. A
+    # question matching a topic is served its summary without retrieval or a
+    # Synthesizer call. Off by default: every worker makes up to
+    # MATERIALIZE_MAX_TOPICS Synthesizer calls at startup and on data changes.
+    MATERIALIZE_ENABLED: bool = False
+    MATERIALIZE_MAX_TOPICS: int = 20
+    MATERIALIZE_MIN_COVERAGE: float = 0.75
+    MATERIALIZE_INTERVAL_SECONDS: float = 60.0
+
+    # Synthesizer: stream its output as "synthesis_token" events. With
+    # SYNTHESIS_AS_ANSWER the synthesis stream is the reply ("token" events)
+    # and the third (Interface) LLM call is skipped on Path B.
+    SYNTHESIZER_STREAM: bool = True
+    SYNTHESIS_AS_ANSWER: bool = False
+
+    # Admission control for /chat: at most SCHEDULER_MAX_ACTIVE turns run at
+    # once (SCHEDULER_MAX_PER_SESSION per session); the rest queue, Path A
+    # first, and get 429 + Retry-After when the queue is full or they wait
+    # longer than SCHEDULER_MAX_WAIT_SECONDS
+    SCHEDULER_MAX_ACTIVE: int = 32
+    SCHEDULER_MAX_PER_SESSION: int = 1
+    SCHEDULER_MAX_QUEUED: int = 256
+    SCHEDULER_MAX_WAIT_SECONDS: float = 10.0
+
+    # SSE streaming: token deltas are batched into one frame per window/byte
+    # threshold (UTF-8 bytes; 0 ms = one frame per token); a connected client
+    # may fall at most SSE_QUEUE_MAXSIZE events behind, so slow clients apply
+    # backpressure to the pipeline.
+    SSE_TOKEN_FLUSH_MS: float = 30.0
+    SSE_TOKEN_FLUSH_BYTES: int = 512
+    SSE_QUEUE_MAXSIZE: int = 64
+    # Send a "timing" event (per-stage milliseconds) before "done"
+    SSE_TIMING_EVENT: bool = False
+    # Resumable streams: each turn's events are kept for SSE_REPLAY_TTL_SECONDS
+    # after it finishes (at most SSE_REPLAY_MAX_TURNS finished turns), so a
+    # reconnect with Last-Event-ID resumes instead of re-running. A turn
+    # whose client disconnected keeps running for SSE_RESUME_GRACE_SECONDS.
+    SSE_REPLAY_TTL_SECONDS: float = 300.0
+    SSE_REPLAY_MAX_TURNS: int = 1000
+    SSE_RESUME_GRACE_SECONDS: float = 15.0
+
+    # Storage for sessions and caches. "sqlite" shares them across workers.
+    # A relative STORAGE_SQLITE_PATH is taken from backend/data, not the cwd.
+    STORAGE_BACKEND: Literal["memory", "sqlite"] = "memory"
+    STORAGE_SQLITE_PATH: str = ".store/state.db"
+    STORAGE_FLUSH_INTERVAL_MS: int = 50
+
+    # Session history (bounded; old turns are folded into a rolling summary)
+    SESSION_MAX_SESSIONS: int = 10_000
+    SESSION_IDLE_TTL_SECONDS: float = 6 * 3600.0
+    SESSION_TOKEN_BUDGET: int = 4000
+    SESSION_SUMMARY_TOKEN_BUDGET: int = 800
+
+    # Synthesis cache (Synthesizer output keyed on query + retrieved data)
+    SYNTHESIS_CACHE_MAX_ENTRIES: int = 1024
+    SYNTHESIS_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    SYNTHESIS_CACHE_TTL_SECONDS: float = 3600.0
 
 
 settings = Settings()
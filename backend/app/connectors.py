@@ -0,0 +1,121 @@
+"""Retrieval connectors: the data sources the Scavenger can search.
+
+A :class:`Connector` wraps one source's blocking search function together
+with what the Scavenger is told about it, and generates its Mistral tool
+schema — adding a source is one entry in :data:`app.tools.CONNECTORS`.
+
+:meth:`Connector.run` searches off the event loop under a deadline. Each
+connector has its own small thread pool, so a hung source can only exhaust
+its own workers; when it misses its deadline (or raises) the call returns a
+one-line placeholder instead, and the turn goes on with the other sources'
+results.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from .metrics import TOOL_FAILURES, TOOL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class Connector:
+    """A searchable source exposed to the Scavenger as the tool *name*.
+
+    *search* takes the query and optional ``since``/``until`` ISO dates
+    (inclusive bounds on the results' dates) and returns passages, one per
+    line, best first (or a not-found message). *label* names the source in
+    placeholders.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        label: str,
+        description: str,
+        query_description: str,
+        search: Callable[[str, str | None, str | None], str],
+        timeout_seconds: float,
+        max_workers: int,
+    ) -> None:
+        self.name = name
+        self.label = label
+        self.description = description
+        self.query_description = query_description
+        self.search = search
+        self.timeout_seconds = timeout_seconds
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix=name)
+
+    def schema(self) -> dict[str, Any]:
+        """The Mistral function-tool schema for this connector."""
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "query": {
+                            "type": "string",
+                            "description": self.query_description,
+                        },
+                        "since": {
+                            "type": "string",
+                            "description": (
+                                "Optional. Only return results dated on or after "
+                                "this day (YYYY-MM-DD)."
+                            ),
+                        },
+                        "until": {
+                            "type": "string",
+                            "description": (
+                                "Optional. Only return results dated on or before "
+                                "this day (YYYY-MM-DD)."
+                            ),
+                        },
+                    },
+                    "required": ["query"],
+                },
+            },
+        }
+
+    async def run(
+        self, query: str, since: str | None = None, until: str | None = None
+    ) -> str:
+        """Search for *query*, or a placeholder if it fails or times out.
+
+        A search that misses the deadline is abandoned, not interrupted:
+        it keeps its worker until it returns.
+        """
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(self._executor, self.search, query, since, until),
+                self.timeout_seconds,
+            )
+        except TimeoutError:
+            TOOL_FAILURES.inc(tool=self.name, reason="timeout")
+            logger.warning(
+                "%s timed out after %.1fs (query %r)",
+                self.name,
+                self.timeout_seconds,
+                query,
+            )
+            return (
+                f"{self.label} did not respond in time; "
+                f"no {self.label} results for query: {query}"
+            )
+        except Exception:
+            TOOL_FAILURES.inc(tool=self.name, reason="error")
+            logger.exception("%s failed (query %r)", self.name, query)
+            return (
+                f"{self.label} search failed; "
+                f"no {self.label} results for query: {query}"
+            )
+        finally:
+            TOOL_SECONDS.observe(time.perf_counter() - start, tool=self.name)
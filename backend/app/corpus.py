@@ -0,0 +1,93 @@
+"""Corpus manager: watches the source exports and applies changes in place.
+
+Each source (see :class:`app.tools._Source`) diffs its export against what
+is indexed and adds/removes only the records that changed, so queries never
+stat or re-read the files and a data update never rebuilds the whole index.
+
+Every applied change bumps :attr:`CorpusManager.version` and records, per
+index term, the version at which its postings last changed. Downstream
+caches use :meth:`CorpusManager.changed_since` to drop only the entries
+whose terms were touched, instead of everything on every update.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Iterable, Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class Source(Protocol):
+    name: str
+
+    def refresh(self) -> set[str] | None:
+        """Apply changes to the export; the touched terms, or None if unchanged."""
+        ...
+
+
+class CorpusManager:
+    """Polls *sources* for changes and versions the indexed corpus."""
+
+    def __init__(self, sources: Iterable[Source]) -> None:
+        self.sources = list(sources)
+        self.version = 0
+        self.changed_at: dict[str, int] = {}  # source name → version
+        self.reloads = 0
+        self.last_reload_ms: float | None = None
+        self._term_versions: dict[str, int] = {}
+        self._lock = threading.Lock()  # one poll at a time
+
+    def poll(self) -> bool:
+        """Apply pending changes of every source; whether any were found.
+
+        Concurrent calls (the watcher, startup, a source loaded on first use)
+        run one after the other.
+        """
+        with self._lock:
+            return self._poll()
+
+    def _poll(self) -> bool:
+        changed = False
+        for source in self.sources:
+            start = time.perf_counter()
+            touched = source.refresh()
+            if touched is None:
+                continue
+            self.version += 1
+            self.changed_at[source.name] = self.version
+            for term in touched:
+                self._term_versions[term] = self.version
+            self.reloads += 1
+            self.last_reload_ms = (time.perf_counter() - start) * 1000
+            changed = True
+            logger.info(
+                "Corpus v%d: %s changed (%d terms, %.1f ms)",
+                self.version,
+                source.name,
+                len(touched),
+                self.last_reload_ms,
+            )
+        return changed
+
+    def changed_since(self, terms: Iterable[str], version: int) -> bool:
+        """Whether any of the index *terms* changed after corpus *version*."""
+        return any(self._term_versions.get(t, 0) > version for t in terms)
+
+    async def watch(self, interval: float) -> None:
+        """Poll every *interval* seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.poll)
+            except Exception:
+                logger.exception("Corpus reload failed; retrying next poll")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "version": self.version,
+            "changed_at": dict(self.changed_at),
+            "reloads": self.reloads,
+            "last_reload_ms": self.last_reload_ms,
+        }
@@ -0,0 +1,205 @@
+"""Dense retrieval: hashed TF-IDF passage vectors in one NumPy matrix.
+
+Each passage becomes a ``dim``-dimensional vector (feature hashing with
+random signs) of its index terms and their character trigrams, after
+mapping common paraphrases onto one canonical term ("sign-in", "log in" →
+"login"). Terms are weighted ``(1 + log tf) · idf`` and rows L2-normalised,
+so scoring every passage against a query is a single matrix-vector product.
+Trigrams make morphological variants ("authenticate" / "authentication")
+overlap even when their index terms differ.
+
+NumPy is optional (the ``dense`` extra): without it :data:`AVAILABLE` is
+False and retrieval stays lexical.
+"""
+
+import math
+import os
+import re
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Collection
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from .index import tokenize
+
+AVAILABLE = np is not None
+
+# Bump when the features change, so persisted matrices are rebuilt
+_FEATURES_VERSION = 1
+
+# Trigram features weigh less than whole terms
+_TRIGRAM_WEIGHT = 0.35
+
+# Paraphrases → canonical term, applied before tokenisation
+_PHRASES = [
+    (re.compile(p, re.IGNORECASE), r)
+    for p, r in (
+        (r"\b(sign|log)[\s-]?(in|on)\b", "login"),
+        (r"\b(sign|log)[\s-]?(out|off)\b", "logout"),
+        (r"\bsign[\s-]?up\b", "signup"),
+        (r"\bsingle[\s-]sign[\s-]on\b", "sso"),
+        (r"\be-?mail\b", "email"),
+        (r"\bpass[\s-]?(word|phrase|code)\b", "password"),
+        (r"\bo-?auth\s*2?(\.0)?\b", "oauth"),
+        (r"\bgo[\s-]live\b", "launch"),
+        (r"\broll[\s-]?out\b", "launch"),
+    )
+]
+_SYNONYMS = {
+    "authentication": "auth",
+    "authenticate": "auth",
+    "authn": "auth",
+    "credential": "password",
+    "pwd": "password",
+    "specification": "spec",
+    "requirement": "spec",
+    "ship": "launch",
+    "release": "launch",
+    "deploy": "launch",
+    "deployment": "launch",
+    "bug": "issue",
+    "defect": "issue",
+    "problem": "issue",
+    "db": "database",
+    "postgres": "database",
+    "ui": "frontend",
+    "ux": "frontend",
+    "server": "backend",
+    "gmail": "google",
+    "gcp": "google",
+    "scrap": "drop",
+    "remove": "drop",
+    "cancel": "drop",
+}
+
+
+def terms(text: str) -> list[str]:
+    """Index terms of *text* with paraphrases mapped to canonical terms."""
+    for pattern, replacement in _PHRASES:
+        text = pattern.sub(replacement, text)
+    return [_SYNONYMS.get(t, t) for t in tokenize(text)]
+
+
+@lru_cache(maxsize=200_000)
+def _term_features(term: str, dim: int) -> tuple[tuple[int, float], ...]:
+    """Signed hashed buckets of *term* and its character trigrams."""
+    padded = f"<{term}>"
+    features = [(term, 1.0)] + [
+        (padded[i : i + 3], _TRIGRAM_WEIGHT) for i in range(len(padded) - 2)
+    ]
+    out = []
+    for feature, weight in features:
+        h = zlib.crc32(feature.encode())  # stable across processes
+        out.append((h % dim, weight if h & 0x80000000 else -weight))
+    return tuple(out)
+
+
+class DenseIndex:
+    """Row-per-passage float32 matrix; rows are set, cleared and searched."""
+
+    def __init__(self, dim: int) -> None:
+        if np is None:
+            raise RuntimeError("dense retrieval requires numpy")
+        self.dim = dim
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        self._rows = 0
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def embed(self, text: str, idf: Callable[[str], float]) -> "np.ndarray":
+        """L2-normalised vector of *text*, terms weighted by *idf*."""
+        counts: dict[str, int] = {}
+        for term in terms(text):
+            counts[term] = counts.get(term, 0) + 1
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for term, tf in counts.items():
+            weight = (1.0 + math.log(tf)) * idf(term)
+            for bucket, value in _term_features(term, self.dim):
+                vector[bucket] += weight * value
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def set(self, row: int, vector: "np.ndarray") -> None:
+        if row >= len(self._matrix):
+            grown = np.zeros(
+                (max(row + 1, 2 * len(self._matrix)), self.dim), np.float32
+            )
+            grown[: self._rows] = self._matrix[: self._rows]
+            self._matrix = grown
+        self._matrix[row] = vector
+        self._rows = max(self._rows, row + 1)
+
+    def clear(self, row: int) -> None:
+        if row < self._rows:
+            self._matrix[row] = 0.0
+
+    def search(
+        self,
+        query: "np.ndarray",
+        k: int,
+        min_score: float = 0.0,
+        allowed: Collection[int] | None = None,
+    ) -> list[tuple[int, float]]:
+        """Up to *k* ``(row, cosine)`` pairs above *min_score*, best first.
+
+        With *allowed*, only those rows are scored.
+        """
+        if not self._rows or k <= 0 or not query.any():
+            return []
+        if allowed is None:
+            rows = None
+            scores = self._matrix[: self._rows] @ query
+        else:
+            rows = np.fromiter((r for r in allowed if r < self._rows), dtype=np.int64)
+            if not len(rows):
+                return []
+            scores = self._matrix[rows] @ query
+        k = min(k, len(scores))
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(scores[top])[::-1]]
+        return [
+            (int(i if rows is None else rows[i]), float(scores[i]))
+            for i in top
+            if scores[i] > min_score
+        ]
+
+    # -- persistence -------------------------------------------------------
+
+    def save(self, path: Path, key: str) -> None:
+        """Write the matrix to *path* (``.npy``), tagged with *key*.
+
+        Both files are written to per-process temporary files and renamed
+        into place, so workers starting together never see a partial one.
+        """
+        key_path = path.with_suffix(".key")
+        key_path.unlink(missing_ok=True)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+        np.save(tmp, self._matrix[: self._rows])
+        os.replace(tmp, path)
+        key_tmp = key_path.with_name(f"{key_path.name}.{os.getpid()}.tmp")
+        key_tmp.write_text(f"{_FEATURES_VERSION}:{self.dim}:{key}")
+        os.replace(key_tmp, key_path)
+
+    def load(self, path: Path, key: str) -> bool:
+        """Load a matrix saved under the same *key*; whether it was found.
+
+        The file is memory-mapped copy-on-write, so rows are paged in on
+        demand and later updates stay private to this process.
+        """
+        try:
+            stored = path.with_suffix(".key").read_text()
+            if stored != f"{_FEATURES_VERSION}:{self.dim}:{key}":
+                return False
+            matrix = np.load(path, mmap_mode="c")
+        except (OSError, ValueError):
+            return False
+        if matrix.ndim != 2 or matrix.shape[1] != self.dim:
+            return False
+        self._matrix, self._rows = matrix, len(matrix)
+        return True
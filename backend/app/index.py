@@ -0,0 +1,163 @@
+import heapq
+import math
+import re
+from collections import defaultdict
+from typing import Collection, Iterable
+
+# ---------------------------------------------------------------------------
+# Tokenisation
+# ---------------------------------------------------------------------------
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be but by can do does for from had has have how i if in
+    is it its just let m me my no not of on or our s so that the their them then
+    there these they this to us was we what when where which who why will with
+    would you your
+    """.split()
+)
+
+
+def _stem(token: str) -> str:
+    """Strip a plural ``s`` so that "specs" and "spec" share a posting list."""
+    if (
+        len(token) > 3
+        and token.endswith("s")
+        and not token.endswith(("ss", "us", "is"))
+    ):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-case, split on non-alphanumerics, drop stopwords and stem."""
+    return [_stem(t) for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+# ---------------------------------------------------------------------------
+# BM25 inverted index
+# ---------------------------------------------------------------------------
+
+
+class InvertedIndex:
+    """Okapi BM25 index over integer document ids.
+
+    Documents are added (and removed) incrementally; queries only touch the
+    posting lists of their own terms, so lookup cost is independent of
+    corpus size for terms that are rare in the corpus.
+
+    Top-k pruning (term-at-a-time MaxScore): terms are scored rarest first,
+    and once the k-th best score so far exceeds the most the remaining terms
+    could add (from each term's BM25 upper bound), no unseen document can
+    reach the top k; the remaining, longer posting lists are then only
+    probed for the candidates that still can, instead of walked.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, dict[int, int]] = defaultdict(dict)
+        self._doc_len: dict[int, int] = {}
+        self._total_len = 0
+        # For score upper bounds: the highest tf seen per term and the
+        # shortest document length seen (neither shrinks on removal, which
+        # keeps the bounds valid, just looser)
+        self._max_tf: dict[str, int] = {}
+        self._min_len: int | None = None
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    def __contains__(self, term: str) -> bool:
+        """Whether any indexed document contains *term* (already tokenized)."""
+        return term in self._postings
+
+    def add(self, doc_id: int, text: str) -> None:
+        """Index *text* under *doc_id*."""
+        tokens = tokenize(text)
+        counts: dict[str, int] = {}
+        for tok in tokens:
+            counts[tok] = counts.get(tok, 0) + 1
+        for tok, tf in counts.items():
+            self._postings[tok][doc_id] = tf
+            if tf > self._max_tf.get(tok, 0):
+                self._max_tf[tok] = tf
+        if self._min_len is None or len(tokens) < self._min_len:
+            self._min_len = len(tokens)
+        self._doc_len[doc_id] = len(tokens)
+        self._total_len += len(tokens)
+
+    def remove(self, doc_id: int, text: str) -> None:
+        """Drop *doc_id*, which must have been indexed with *text*."""
+        length = self._doc_len.pop(doc_id, None)
+        if length is None:
+            return
+        for tok in set(tokenize(text)):
+            postings = self._postings.get(tok)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[tok]
+                self._max_tf.pop(tok, None)
+        self._total_len -= length
+
+    def idf(self, term: str) -> float:
+        """BM25 inverse document frequency of *term* (already tokenized)."""
+        df = len(self._postings.get(term, ()))
+        return math.log(1.0 + (len(self._doc_len) - df + 0.5) / (df + 0.5))
+
+    def search(
+        self, query: str, k: int, allowed: Collection[int] | None = None
+    ) -> list[tuple[int, float]]:
+        """Return up to *k* ``(doc_id, score)`` pairs, best first.
+
+        With *allowed*, only those documents are scored; each posting list
+        is walked or probed, whichever is shorter.
+        """
+        n_docs = len(self._doc_len)
+        if not n_docs or k <= 0:
+            return []
+
+        avg_len = self._total_len / n_docs or 1.0
+        k1, b = self.k1, self.b
+        min_norm = k1 * (1.0 - b + b * (self._min_len or 0) / avg_len)
+        terms = []
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if postings:
+                df = len(postings)
+                idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                max_tf = self._max_tf[term]
+                bound = idf * max_tf * (k1 + 1.0) / (max_tf + min_norm)
+                terms.append((df, idf, bound, postings))
+        terms.sort(key=lambda t: t[0])  # rarest first
+        # remaining[i]: the most terms i.. can add to any document's score
+        remaining = [0.0] * (len(terms) + 1)
+        for i in range(len(terms) - 1, -1, -1):
+            remaining[i] = remaining[i + 1] + terms[i][2]
+
+        scores: dict[int, float] = {}
+        for i, (df, idf, _, postings) in enumerate(terms):
+            if len(scores) >= k and df > len(scores):
+                threshold = heapq.nlargest(k, scores.values())[-1]
+                if threshold > remaining[i]:
+                    # Only documents already scored can still make the top k
+                    scores = {
+                        d: s for d, s in scores.items() if s + remaining[i] >= threshold
+                    }
+                    allowed = scores.keys()
+            if allowed is None:
+                matches: Iterable[tuple[int, int]] = postings.items()
+            elif len(allowed) < df:
+                matches = [(d, postings[d]) for d in allowed if d in postings]
+            else:
+                matches = [(d, tf) for d, tf in postings.items() if d in allowed]
+            for doc_id, tf in matches:
+                norm = k1 * (1.0 - b + b * self._doc_len[doc_id] / avg_len)
+                score = idf * tf * (k1 + 1.0) / (tf + norm)
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
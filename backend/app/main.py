@@ -1,26 +1,176 @@
 import asyncio
 import json
 import logging
-import threading
+import time
 from contextlib import asynccontextmanager
-from typing import Any, AsyncGenerator, Callable
+from typing import Any, AsyncGenerator, AsyncIterator, Callable
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from sse_starlette.sse import EventSourceResponse
 
 from . import agents as _agents
-from .agents import AGENTS, setup_agents
+from . import upstream
+from .agents import AGENTS, agents_ready, ensure_agents, setup_agents
+from .cache import LRUCache, make_key, normalize_query
+from .coalesce import Emit, SingleFlight
 from .config import settings
+from .index import tokenize
+from .materialize import Materializer
+from .metrics import (
+    ADMISSION_WAIT_SECONDS,
+    AGENT_CHUNKS,
+    CHAT_ERRORS,
+    CHAT_REJECTED,
+    CHAT_TURNS,
+    PREFETCH_REQUESTS,
+    QUEUE_WAIT_SECONDS,
+    REGISTRY,
+    ROUTER_DECISIONS,
+    TTFT_SECONDS,
+    TURN_TIMINGS,
+    Collector,
+    record_stage,
+    record_usage,
+    span,
+)
+from .passages import assemble_context
+from .prefetch import PrefetchCache
+from .replay import ReplayBuffer, Turn
+from .router import RouteDecision, route
+from .scheduler import PATH_A, PATH_B, Overloaded, Scheduler
 from .schemas import ChatRequest
-from .tools import execute_tool
+from .sessions import Session, SessionStore
+from .storage import create_storage
+from .streaming import TokenCoalescer
+from .tools import (
+    CORPUS,
+    TOOL_REGISTRY,
+    corpus_terms,
+    corpus_version,
+    cross_source_topics,
+    execute_tool,
+    load_sources,
+    run_tool,
+)
+from .upstream import deadline
 
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
-# In-memory chat history  { session_id → [{"role": ..., "content": ...}, ...] }
+# Chat history  { session_id → [{"role": ..., "content": ...}, ...] }
+# Kept in-process or in SQLite shared by all workers (see app/storage.py)
+# ---------------------------------------------------------------------------
+STORAGE = create_storage()
+
+SESSION_HISTORY = SessionStore(
+    storage=STORAGE,
+    max_sessions=settings.SESSION_MAX_SESSIONS,
+    idle_ttl_seconds=settings.SESSION_IDLE_TTL_SECONDS,
+    token_budget=settings.SESSION_TOKEN_BUDGET,
+    summary_token_budget=settings.SESSION_SUMMARY_TOKEN_BUDGET,
+)
+
+# ---------------------------------------------------------------------------
+# Synthesizer result cache  { hash(query, retrieved data) → synthesis }
+# ---------------------------------------------------------------------------
+SYNTHESIS_CACHE = LRUCache(
+    max_entries=settings.SYNTHESIS_CACHE_MAX_ENTRIES,
+    max_bytes=settings.SYNTHESIS_CACHE_MAX_BYTES,
+    ttl_seconds=settings.SYNTHESIS_CACHE_TTL_SECONDS,
+    storage=STORAGE if settings.STORAGE_BACKEND != "memory" else None,
+    namespace="synthesis",
+)
+
+# Concurrent Path B turns with matching inputs share one Scavenger/Synthesizer run
+PIPELINE_FLIGHTS = SingleFlight()
+
+# Buffered events of recent turns, for Last-Event-ID resumption (app/replay.py)
+REPLAY = ReplayBuffer(
+    ttl_seconds=settings.SSE_REPLAY_TTL_SECONDS,
+    max_turns=settings.SSE_REPLAY_MAX_TURNS,
+    max_lag=settings.SSE_QUEUE_MAXSIZE,
+)
+
+# Retrieval started for drafts while the user types (see app/prefetch.py)
+PREFETCH = PrefetchCache(
+    ttl_seconds=settings.PREFETCH_TTL_SECONDS,
+    max_entries=settings.PREFETCH_MAX_ENTRIES,
+    max_inflight=settings.PREFETCH_MAX_INFLIGHT,
+)
+
+# Admission control in front of every chat turn (see app/scheduler.py)
+SCHEDULER = Scheduler(
+    max_active=settings.SCHEDULER_MAX_ACTIVE,
+    max_per_session=settings.SCHEDULER_MAX_PER_SESSION,
+    max_queued=settings.SCHEDULER_MAX_QUEUED,
+    max_wait_seconds=settings.SCHEDULER_MAX_WAIT_SECONDS,
+)
+
+# ---------------------------------------------------------------------------
+# Materialized Source of Truth summaries for topics spanning both sources
 # ---------------------------------------------------------------------------
-SESSION_HISTORY: dict[str, list[dict[str, str]]] = {}
+MATERIALIZED = Materializer(
+    storage=STORAGE,
+    topics=cross_source_topics,
+    retrieve=lambda query: _context(
+        [execute_tool(name, query) for name in TOOL_REGISTRY]
+    ),
+    synthesize=lambda context: _synthesize_topic(context),
+    changed_since=CORPUS.changed_since,
+    max_topics=settings.MATERIALIZE_MAX_TOPICS,
+    min_coverage=settings.MATERIALIZE_MIN_COVERAGE,
+)
+
+Collector(
+    "chaoscontext_synthesis_cache_lookups_total",
+    "Synthesis cache lookups by result.",
+    lambda: {
+        ("hit",): SYNTHESIS_CACHE.hits,
+        ("miss",): SYNTHESIS_CACHE.misses,
+    },
+    ("result",),
+    kind="counter",
+)
+Collector(
+    "chaoscontext_prefetch_lookups_total",
+    "Path B retrievals by whether prefetched results were used.",
+    lambda: {("hit",): PREFETCH.hits, ("miss",): PREFETCH.misses},
+    ("result",),
+    kind="counter",
+)
+Collector(
+    "chaoscontext_pipeline_flights_total",
+    "Path B retrieval/synthesis runs: executed vs. joined an in-flight run.",
+    lambda: {
+        ("executed",): PIPELINE_FLIGHTS.executions,
+        ("coalesced",): PIPELINE_FLIGHTS.coalesced,
+    },
+    ("outcome",),
+    kind="counter",
+)
+Collector(
+    "chaoscontext_admission_slots",
+    "Chat turns running (active) or waiting for a slot (queued).",
+    lambda: {("active",): SCHEDULER.active, ("queued",): len(SCHEDULER)},
+    ("state",),
+)
+Collector(
+    "chaoscontext_corpus_version",
+    "Corpus version: bumped by every source change applied to the index.",
+    lambda: {(): CORPUS.version},
+)
+Collector(
+    "chaoscontext_materialized_lookups_total",
+    "Path B turns served a materialized summary (hit) vs. not (miss).",
+    lambda: {
+        ("hit",): MATERIALIZED.hits,
+        ("miss",): MATERIALIZED.misses,
+    },
+    ("result",),
+    kind="counter",
+)
 
 
 # ---------------------------------------------------------------------------
@@ -28,13 +178,51 @@ SESSION_HISTORY: dict[str, list[dict[str, str]]] = {}
 # ---------------------------------------------------------------------------
 
 
+# Agent setup + indexing, run in the background so the server accepts
+# connections (and answers /health) immediately; /ready reports completion
+STARTUP: asyncio.Task[None] | None = None
+CORPUS_WATCH_TASK: asyncio.Task[None] | None = None
+MATERIALIZE_TASK: asyncio.Task[None] | None = None
+
+
+async def _startup() -> None:
+    global CORPUS_WATCH_TASK, MATERIALIZE_TASK
+    try:
+        logger.info("Starting up: creating Mistral agents...")
+        await setup_agents()
+        logger.info("Indexing Notion and Slack data...")
+        await asyncio.to_thread(load_sources)
+    except Exception:
+        logger.exception("Startup failed")
+        raise
+    if settings.CORPUS_POLL_INTERVAL_SECONDS > 0:
+        CORPUS_WATCH_TASK = asyncio.create_task(
+            CORPUS.watch(settings.CORPUS_POLL_INTERVAL_SECONDS)
+        )
+    if settings.MATERIALIZE_ENABLED:
+        MATERIALIZE_TASK = asyncio.create_task(
+            MATERIALIZED.run(corpus_version, settings.MATERIALIZE_INTERVAL_SECONDS)
+        )
+    logger.info("Startup complete.")
+
+
+async def _wait_until_ready() -> None:
+    """Block a chat turn until startup (and any deferred verification) is done."""
+    if STARTUP is not None:
+        await asyncio.shield(STARTUP)
+    await ensure_agents()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """FastAPI lifespan — run startup logic before yielding."""
-    logger.info("Starting up: creating Mistral agents...")
-    await setup_agents()
-    logger.info("Startup complete.")
+    """FastAPI lifespan — start startup logic, then serve while it runs."""
+    global STARTUP
+    STARTUP = asyncio.create_task(_startup())
     yield
+    for task in (STARTUP, CORPUS_WATCH_TASK, MATERIALIZE_TASK):
+        if task is not None and not task.done():
+            task.cancel()
+    STORAGE.close()
 
 
 app = FastAPI(
@@ -54,6 +242,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
 
@@ -66,15 +255,45 @@ def _sse(event_type: str, data: dict[str, Any]) -> dict[str, str]:
     return {"event": event_type, "data": json.dumps(data)}
 
 
+async def _discard(event_type: str, data: dict[str, Any]) -> None:
+    """Emit target for pipeline stages run outside a chat turn."""
+
+
 # ---------------------------------------------------------------------------
-# Per-agent helpers (synchronous — called from background thread)
+# Per-agent helpers (async — run on the request's event loop)
 # ---------------------------------------------------------------------------
 
 
-def _run_scavenger(user_message: str, emit: Callable) -> str:
+async def _stream_content(agent: str, messages: list[dict]) -> AsyncIterator[str]:
+    """Yield *agent*'s streamed content deltas, recording TTFT and usage."""
+    start = time.perf_counter()
+    first = True
+    async with upstream.stream(
+        _agents.client, agent, agent_id=AGENTS[agent], messages=messages
+    ) as stream:
+        async for chunk in stream:
+            record_usage(agent, getattr(chunk.data, "usage", None))
+            content = chunk.data.choices[0].delta.content
+            if not content:
+                continue
+            if first:
+                first = False
+                ttft = time.perf_counter() - start
+                TTFT_SECONDS.observe(ttft, agent=agent)
+                record_stage(f"{agent}_ttft", ttft)
+            AGENT_CHUNKS.inc(agent=agent)
+            yield content
+
+
+def _context(results: list[str]) -> str:
+    """Tool results → Synthesizer input (deduplicated, within the token budget)."""
+    return assemble_context(results, settings.SYNTHESIS_INPUT_TOKEN_BUDGET)
+
+
+async def _run_scavenger(user_message: str, emit: Emit) -> str:
     """Call the Scavenger agent, executing tool calls until it finishes.
 
-    Returns the concatenated raw tool results (passed to Synthesizer).
+    Returns the assembled tool results (passed to Synthesizer).
     """
     messages: list[dict] = [{"role": "user", "content": user_message}]
     results_parts: list[str] = []
@@ -82,17 +301,21 @@ def _run_scavenger(user_message: str, emit: Callable) -> str:
     while True:
         tool_calls_collected: list[Any] = []
 
-        for chunk in _agents.client.agents.stream(
+        async with upstream.stream(
+            _agents.client,
+            "scavenger",
             agent_id=AGENTS["scavenger"],
             messages=messages,
-        ):
-            choice = chunk.data.choices[0]
-            if choice.delta.tool_calls:
-                tool_calls_collected.extend(choice.delta.tool_calls)
-            finish_reason = choice.finish_reason
-            if finish_reason and finish_reason != "tool_calls":
-                # Scavenger produced a text conclusion — stop the loop
-                return "\n\n".join(results_parts)
+        ) as stream:
+            async for chunk in stream:
+                record_usage("scavenger", getattr(chunk.data, "usage", None))
+                choice = chunk.data.choices[0]
+                if choice.delta.tool_calls:
+                    tool_calls_collected.extend(choice.delta.tool_calls)
+                finish_reason = choice.finish_reason
+                if finish_reason and finish_reason != "tool_calls":
+                    # Scavenger produced a text conclusion — stop the loop
+                    return _context(results_parts)
 
         if not tool_calls_collected:
             break  # nothing more to do
@@ -116,54 +339,172 @@ def _run_scavenger(user_message: str, emit: Callable) -> str:
             }
         )
 
-        # Execute each tool and emit SSE events
+        # Execute the round's tool calls concurrently and emit SSE events
+        calls: list[tuple[Any, dict[str, str]]] = []
         for tc in tool_calls_collected:
-            name: str = tc.function.name
             try:
                 args = json.loads(tc.function.arguments)
             except (json.JSONDecodeError, TypeError):
                 args = {}
-            query: str = args.get("query", "")
+            if not isinstance(args, dict):
+                args = {}
+            # query, plus the optional since/until date bounds
+            params = {
+                key: args[key]
+                for key in ("query", "since", "until")
+                if isinstance(args.get(key), str) and args[key]
+            }
+            params.setdefault("query", "")
+            calls.append((tc, params))
+            await emit(
+                "tool_call", {"agent": "scavenger", "tool": tc.function.name, **params}
+            )
 
-            emit("tool_call", {"agent": "scavenger", "tool": name, "query": query})
-            result = execute_tool(name, query)
-            emit("tool_result", {"agent": "scavenger", "tool": name, "result": result})
-            results_parts.append(result)
+        async def call(
+            index: int, name: str, params: dict[str, str]
+        ) -> tuple[int, str]:
+            return index, await run_tool(name, **params)
+
+        results: list[str] = [""] * len(calls)
+        for next_done in asyncio.as_completed(
+            [call(i, tc.function.name, params) for i, (tc, params) in enumerate(calls)]
+        ):
+            index, result = await next_done
+            results[index] = result
+            await emit(
+                "tool_result",
+                {
+                    "agent": "scavenger",
+                    "tool": calls[index][0].function.name,
+                    "result": result,
+                },
+            )
 
+        for (tc, _), result in zip(calls, results):
+            results_parts.append(result)
             messages.append(
                 {
                     "role": "tool",
                     "tool_call_id": tc.id,
-                    "name": name,
+                    "name": tc.function.name,
                     "content": result,
                 }
             )
 
-    return "\n\n".join(results_parts)
+    return _context(results_parts)
 
 
-def _run_synthesizer(scavenger_output: str) -> str:
-    """Call the Synthesizer agent synchronously and return its text output."""
-    resp = _agents.client.agents.complete(
-        agent_id=AGENTS["synthesizer"],
-        messages=[
-            {
-                "role": "user",
-                "content": (
-                    "Here is the raw data retrieved from Notion and Slack:\n\n"
-                    f"{scavenger_output}\n\n"
-                    "Please synthesize this data and produce a Source of Truth summary."
-                ),
-            }
-        ],
+async def _run_retrieval(user_message: str, emit: Emit) -> str:
+    """Run every registered tool directly, concurrently, on the user's message.
+
+    Deterministic replacement for the Scavenger loop: the Scavenger prompt
+    always calls every tool with the raw question, so the LLM round-trips are
+    skipped. Emits the same ``tool_call``/``tool_result`` events and returns
+    the assembled results (registry order within the budget). A source that
+    misses its deadline contributes a placeholder line (see
+    ``app/connectors.py``). Results prefetched for the draft of this message
+    (``/prefetch``) are used instead of searching again.
+    """
+    names = list(TOOL_REGISTRY)
+
+    async def run(name: str) -> tuple[str, str]:
+        return name, await run_tool(name, user_message)
+
+    for name in names:
+        await emit(
+            "tool_call", {"agent": "scavenger", "tool": name, "query": user_message}
+        )
+
+    if settings.PREFETCH_ENABLED:
+        prefetched = await PREFETCH.take(_prefetch_key(user_message))
+        if prefetched is not None and set(prefetched) == set(names):
+            for name in names:
+                await emit(
+                    "tool_result",
+                    {"agent": "scavenger", "tool": name, "result": prefetched[name]},
+                )
+            return _context([prefetched[name] for name in names])
+
+    results: dict[str, str] = {}
+    for next_done in asyncio.as_completed([run(name) for name in names]):
+        name, result = await next_done
+        results[name] = result
+        await emit(
+            "tool_result", {"agent": "scavenger", "tool": name, "result": result}
+        )
+
+    return _context([results[name] for name in names])
+
+
+def _prefetch_key(user_message: str) -> str:
+    return make_key(normalize_query(user_message), str(corpus_version()))
+
+
+async def _prefetch_results(user_message: str) -> dict[str, str]:
+    """Every tool's result for *user_message* (the work ``/prefetch`` starts)."""
+    names = list(TOOL_REGISTRY)
+    results = await asyncio.gather(*(run_tool(name, user_message) for name in names))
+    return dict(zip(names, results))
+
+
+async def _run_synthesizer(scavenger_output: str, emit: Emit) -> str:
+    """Call the Synthesizer agent and return its text output.
+
+    With ``SYNTHESIZER_STREAM`` the output is streamed and forwarded as it
+    arrives: as ``synthesis_token`` progress events, or as ``token`` events
+    when ``SYNTHESIS_AS_ANSWER`` makes the synthesis the user-facing reply.
+    """
+    messages = [
+        {
+            "role": "user",
+            "content": (
+                "Here is the raw data retrieved from Notion and Slack:\n\n"
+                f"{scavenger_output}\n\n"
+                "Please synthesize this data and produce a Source of Truth summary."
+            ),
+        }
+    ]
+    frames = TokenCoalescer(
+        emit,
+        event_type="token" if settings.SYNTHESIS_AS_ANSWER else "synthesis_token",
+        window_ms=settings.SSE_TOKEN_FLUSH_MS,
+        max_bytes=settings.SSE_TOKEN_FLUSH_BYTES,
     )
-    return resp.choices[0].message.content or ""
+
+    if not settings.SYNTHESIZER_STREAM:
+        resp = await upstream.complete(
+            _agents.client,
+            "synthesizer",
+            hedge=settings.UPSTREAM_HEDGE_ENABLED,
+            agent_id=AGENTS["synthesizer"],
+            messages=messages,
+        )
+        record_usage("synthesizer", resp.usage)
+        synthesis = resp.choices[0].message.content or ""
+        if settings.SYNTHESIS_AS_ANSWER and synthesis:
+            async with frames:
+                await frames.add(synthesis)
+        return synthesis
+
+    parts: list[str] = []
+    async with frames:
+        async for text in _stream_content("synthesizer", messages):
+            parts.append(text)
+            await frames.add(text)
+
+    return "".join(parts)
 
 
-def _run_interface(
+async def _synthesize_topic(context: str) -> str:
+    """Synthesizer summary of a materialized topic's passages (no events)."""
+    async with deadline("synthesizer", settings.SYNTHESIZER_DEADLINE_SECONDS):
+        return await _run_synthesizer(context, _discard)
+
+
+async def _run_interface(
     history: list[dict[str, str]],
     user_message: str,
-    emit: Callable,
+    emit: Emit,
     synthesis: str | None = None,
 ) -> list[str]:
     """Stream the Interface agent's final response.
@@ -186,106 +527,263 @@ def _run_interface(
     messages = [*history_messages, {"role": "user", "content": user_content}]
 
     tokens: list[str] = []
-    for chunk in _agents.client.agents.stream(
-        agent_id=AGENTS["interface"],
-        messages=messages,
-    ):
-        choice = chunk.data.choices[0]
-        if choice.delta.content:
-            text = choice.delta.content
+    async with TokenCoalescer(
+        emit,
+        window_ms=settings.SSE_TOKEN_FLUSH_MS,
+        max_bytes=settings.SSE_TOKEN_FLUSH_BYTES,
+    ) as frames:
+        async for text in _stream_content("interface", messages):
             tokens.append(text)
-            emit("token", {"text": text})
+            await frames.add(text)
 
     return tokens
 
 
 # ---------------------------------------------------------------------------
-# Synchronous orchestration loop (runs in a background thread)
+# Orchestration pipeline (one asyncio task per chat turn)
 # ---------------------------------------------------------------------------
 
 
-def _sync_orchestrate(
-    session_id: str,
-    user_message: str,
-    queue: asyncio.Queue,  # type: ignore[type-arg]
-    loop: asyncio.AbstractEventLoop,
-) -> None:
-    """Drive the full multi-agent pipeline and push SSE dicts into *queue*.
-
-    Routing:
-    - Path A (follow-up): SESSION_HISTORY non-empty → Interface answers directly.
-    - Path B (fresh data needed): no prior history → full
-      Interface → Scavenger → Synthesizer → Interface pipeline.
+async def _retrieve_and_synthesize(user_message: str, emit: Emit) -> tuple[str, str]:
+    """Scavenger → Synthesizer half of Path B.
+
+    Returns ``(retrieved data, synthesis)``.
+
+    Runs under :data:`PIPELINE_FLIGHTS`, so every event emitted here is
+    fanned out to all sessions sharing the execution.
     """
+    # A precomputed topic summary → skip retrieval and the Synthesizer
+    topic = MATERIALIZED.lookup(user_message) if settings.MATERIALIZE_ENABLED else None
+    if topic is not None:
+        if settings.SYNTHESIS_AS_ANSWER:
+            await emit("token", {"text": topic.summary})
+        return topic.context, topic.summary
+
+    await emit("handoff", {"from": "interface", "to": "scavenger"})
+    await emit("agent_start", {"agent": "scavenger"})
+
+    with span("scavenger"):
+        async with deadline("scavenger", settings.SCAVENGER_DEADLINE_SECONDS):
+            if settings.RETRIEVAL_MODE == "agent":
+                scavenger_output = await _run_scavenger(user_message, emit)
+            else:
+                scavenger_output = await _run_retrieval(user_message, emit)
+
+    # The same question over the same data answered before → skip the
+    # Synthesizer
+    cache_key = make_key(normalize_query(user_message), scavenger_output)
+    synthesis = SYNTHESIS_CACHE.get(cache_key)
+
+    if synthesis is None:
+        await emit("handoff", {"from": "scavenger", "to": "synthesizer"})
+        await emit("agent_start", {"agent": "synthesizer"})
+
+        with span("synthesizer"):
+            async with deadline("synthesizer", settings.SYNTHESIZER_DEADLINE_SECONDS):
+                synthesis = await _run_synthesizer(scavenger_output, emit)
+        # Reached only if the stage finished within its deadline; an empty
+        # synthesis (e.g. a stream that ended early) is not worth keeping
+        if synthesis:
+            SYNTHESIS_CACHE.put(cache_key, synthesis)
+
+        if not settings.SYNTHESIS_AS_ANSWER:
+            await emit("handoff", {"from": "synthesizer", "to": "interface"})
+    elif settings.SYNTHESIS_AS_ANSWER:
+        await emit("token", {"text": synthesis})
+    else:
+        await emit("handoff", {"from": "scavenger", "to": "interface"})
 
-    def emit(event_type: str, data: dict[str, Any]) -> None:
-        loop.call_soon_threadsafe(queue.put_nowait, _sse(event_type, data))
+    return scavenger_output, synthesis
 
-    history = SESSION_HISTORY.get(session_id, [])
-    needs_pipeline = len(history) == 0
 
-    try:
-        if needs_pipeline:
-            # ── Path B: full retrieval pipeline ──────────────────────────
-            emit("agent_start", {"agent": "interface"})
-            emit("handoff", {"from": "interface", "to": "scavenger"})
-            emit("agent_start", {"agent": "scavenger"})
+async def _shared_retrieve_and_synthesize(
+    user_message: str, emit: Emit
+) -> tuple[str, str, dict[str, float]]:
+    """:func:`_retrieve_and_synthesize` as a :data:`PIPELINE_FLIGHTS` execution.
 
-            scavenger_output = _run_scavenger(user_message, emit)
+    Flights run in a fresh context, so the stage timings are collected here
+    and returned for every attached turn to report; the stages keep their
+    own deadlines.
+    """
+    timings: dict[str, float] = {}
+    TURN_TIMINGS.set(timings)
+    retrieved, synthesis = await _retrieve_and_synthesize(user_message, emit)
+    return retrieved, synthesis, timings
+
+
+def _decide(session: Session, user_message: str) -> RouteDecision:
+    has_history = bool(session.turns or session.summary)
+    if not settings.ROUTER_ENABLED:
+        return RouteDecision(not has_history, 1.0, "history")
+    return route(
+        user_message,
+        session.terms,
+        has_history,
+        lambda terms: corpus_terms(terms, user_message),
+        threshold=settings.ROUTER_COVERAGE_THRESHOLD,
+    )
+
+
+def _route(session_id: str, session: Session, user_message: str) -> RouteDecision:
+    """Choose Path A or Path B for this turn (see ``app/router.py``)."""
+    start = time.perf_counter()
+    decision = _decide(session, user_message)
+    elapsed = time.perf_counter() - start
+    record_stage("router", elapsed)
+    ROUTER_DECISIONS.inc(path=decision.path, reason=decision.reason)
+    logger.info(
+        "Route session=%s path=%s reason=%s confidence=%.2f coverage=%s (%.3f ms)",
+        session_id,
+        decision.path,
+        decision.reason,
+        decision.confidence,
+        decision.coverage,
+        elapsed * 1000,
+    )
+    return decision
 
-            emit("handoff", {"from": "scavenger", "to": "synthesizer"})
-            emit("agent_start", {"agent": "synthesizer"})
 
-            synthesis = _run_synthesizer(scavenger_output)
+async def _run_pipeline(session_id: str, user_message: str, emit: Emit) -> None:
+    """Drive the full multi-agent pipeline, emitting SSE events as it goes.
 
-            emit("handoff", {"from": "synthesizer", "to": "interface"})
-            emit("agent_start", {"agent": "interface"})
+    Routing (per turn, by :func:`app.router.route` — no LLM call):
+    - Path A (answerable from the conversation): Interface answers directly.
+    - Path B (fresh data needed): full
+      Interface → Scavenger → Synthesizer → Interface pipeline. Concurrent
+      Path B turns with the same normalized question share one
+      Scavenger/Synthesizer execution; each still gets its own Interface reply.
+      With ``SYNTHESIS_AS_ANSWER`` the streamed synthesis is the reply and the
+      final Interface call is skipped.
+    """
+    session = SESSION_HISTORY.get_session(session_id)
+    history = session.messages()
 
-            tokens = _run_interface(history, user_message, emit, synthesis=synthesis)
-        else:
-            # ── Path A: Interface answers from conversation history ───────
-            emit("agent_start", {"agent": "interface"})
-            tokens = _run_interface(history, user_message, emit)
+    path = "A"
+    timings: dict[str, float] = {}
+    TURN_TIMINGS.set(timings)
+    start = time.perf_counter()
 
-        # Persist turn to session history
-        assembled = "".join(tokens)
-        if assembled:
-            turn_history = SESSION_HISTORY.setdefault(session_id, [])
-            turn_history.append({"role": "user", "content": user_message})
-            turn_history.append({"role": "assistant", "content": assembled})
+    try:
+        async with deadline("turn", settings.TURN_DEADLINE_SECONDS):
+            await _wait_until_ready()
+
+            decision = _route(session_id, session, user_message)
+            path = decision.path
+            CHAT_TURNS.inc(path=path)
+            retrieved = ""
+
+            if decision.retrieve:
+                # ── Path B: full retrieval pipeline ──────────────────────────
+                await emit("agent_start", {"agent": "interface"})
+
+                flight_key = make_key(
+                    normalize_query(user_message),
+                    settings.RETRIEVAL_MODE,
+                    str(corpus_version()),
+                )
+                # This turn's wait for the (possibly shared) execution is
+                # timed and bounded here, in the turn's own context
+                with span("retrieve_and_synthesize"):
+                    async with deadline(
+                        "retrieve_and_synthesize",
+                        settings.SCAVENGER_DEADLINE_SECONDS
+                        + settings.SYNTHESIZER_DEADLINE_SECONDS,
+                    ):
+                        retrieved, synthesis, stages = await PIPELINE_FLIGHTS.run(
+                            flight_key,
+                            lambda shared_emit: _shared_retrieve_and_synthesize(
+                                user_message, shared_emit
+                            ),
+                            emit,
+                        )
+                timings.update(stages)
+
+                if settings.SYNTHESIS_AS_ANSWER:
+                    tokens = [synthesis]
+                else:
+                    await emit("agent_start", {"agent": "interface"})
+                    with span("interface"):
+                        async with deadline(
+                            "interface", settings.INTERFACE_DEADLINE_SECONDS
+                        ):
+                            tokens = await _run_interface(
+                                history, user_message, emit, synthesis=synthesis
+                            )
+            else:
+                # ── Path A: Interface answers from conversation history ───────
+                await emit("agent_start", {"agent": "interface"})
+                with span("interface"):
+                    async with deadline(
+                        "interface", settings.INTERFACE_DEADLINE_SECONDS
+                    ):
+                        tokens = await _run_interface(history, user_message, emit)
+
+            # Persist turn to session history
+            assembled = "".join(tokens)
+            if assembled:
+                SESSION_HISTORY.append(
+                    session_id, user_message, assembled, context=retrieved
+                )
 
     except Exception as exc:
         logger.exception("Orchestration error: %s", exc)
-        emit("error", {"message": str(exc)})
+        CHAT_ERRORS.inc()
+        await emit("error", {"message": str(exc)})
 
-    emit("done", {})
-    loop.call_soon_threadsafe(queue.put_nowait, None)  # sentinel → consumer stops
+    record_stage("total", time.perf_counter() - start)
+    if settings.SSE_TIMING_EVENT:
+        await emit("timing", {"path": path, "stages_ms": timings})
+    await emit("done", {})
 
 
 # ---------------------------------------------------------------------------
-# Async generator wrapper (consumes the thread's queue)
+# Async generator wrapper (consumes the pipeline task's queue)
 # ---------------------------------------------------------------------------
 
 
+def _start_turn(
+    session_id: str, user_message: str, on_finish: Callable[[], None] | None = None
+) -> Turn:
+    """Start the pipeline for one turn, buffering its events in :data:`REPLAY`.
+
+    The pipeline runs as its own task, independent of any connection;
+    *on_finish* is called when it ends (completed, failed or cancelled).
+    """
+    turn = REPLAY.create(session_id)
+
+    async def emit(event_type: str, data: dict[str, Any]) -> None:
+        await turn.put(_sse(event_type, data))
+
+    def finished(_: asyncio.Task[None]) -> None:
+        turn.finish()
+        if on_finish is not None:
+            on_finish()
+
+    turn.task = asyncio.create_task(_run_pipeline(session_id, user_message, emit))
+    turn.task.add_done_callback(finished)
+    return turn
+
+
+async def _follow(turn: Turn, after: int = 0) -> AsyncGenerator[dict[str, str], None]:
+    """Yield *turn*'s SSE dicts after seq *after*, then live ones until done.
+
+    If the client disconnects, the pipeline keeps running for
+    ``SSE_RESUME_GRACE_SECONDS`` so a reconnect can pick it up; then it is
+    cancelled, which aborts any in-flight upstream LLM stream.
+    """
+    async for appended_at, event in turn.follow(
+        after, settings.SSE_RESUME_GRACE_SECONDS
+    ):
+        QUEUE_WAIT_SECONDS.observe(time.perf_counter() - appended_at)
+        yield event
+
+
 async def orchestrate(
     session_id: str, user_message: str
 ) -> AsyncGenerator[dict[str, str], None]:
-    """Async generator that drives the sync loop in a thread and yields SSE dicts."""
-    queue: asyncio.Queue[dict[str, str] | None] = asyncio.Queue()
-    loop = asyncio.get_event_loop()
-
-    thread = threading.Thread(
-        target=_sync_orchestrate,
-        args=(session_id, user_message, queue, loop),
-        daemon=True,
-    )
-    thread.start()
-
-    while True:
-        item = await queue.get()
-        if item is None:
-            break
-        yield item
+    """Run one turn and yield its SSE dicts (see :func:`_start_turn`)."""
+    async for event in _follow(_start_turn(session_id, user_message)):
+        yield event
 
 
 # ---------------------------------------------------------------------------
@@ -307,14 +805,132 @@ async def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
-@app.post("/chat")
-async def chat(request: ChatRequest) -> EventSourceResponse:
+@app.get("/ready")
+async def ready() -> JSONResponse:
+    """Readiness probe: 200 once agents are set up and sources indexed."""
+    if STARTUP is not None and STARTUP.done():
+        if STARTUP.cancelled() or STARTUP.exception() is not None:
+            error = "cancelled" if STARTUP.cancelled() else str(STARTUP.exception())
+            return JSONResponse({"status": "failed", "error": error}, status_code=503)
+        if agents_ready():
+            return JSONResponse({"status": "ready"})
+    return JSONResponse({"status": "starting"}, status_code=503)
+
+
+@app.get("/stats")
+async def stats() -> dict[str, Any]:
+    return {
+        "storage": STORAGE.stats(),
+        "corpus": CORPUS.stats(),
+        "sessions": SESSION_HISTORY.stats(),
+        "synthesis_cache": SYNTHESIS_CACHE.stats(),
+        "pipeline_flights": PIPELINE_FLIGHTS.stats(),
+        "scheduler": SCHEDULER.stats(),
+        "prefetch": PREFETCH.stats(),
+        "replay": REPLAY.stats(),
+        "materialized": MATERIALIZED.stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Prometheus text exposition of pipeline latency and throughput metrics."""
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def _priority(session_id: str, user_message: str) -> int:
+    """Admission priority: the path the router would choose right now.
+
+    Until startup completes the corpus is not loaded, so every turn is
+    treated as Path B.
+    """
+    if STARTUP is not None and not STARTUP.done():
+        return PATH_B
+    decision = _decide(SESSION_HISTORY.get_session(session_id), user_message)
+    return PATH_B if decision.retrieve else PATH_A
+
+
+@app.post("/prefetch", status_code=202)
+async def prefetch(request: ChatRequest) -> dict[str, str]:
+    """Start retrieval for a draft message so the turn that follows skips it.
+
+    Best effort: the ``status`` says whether anything was started. Drafts
+    with too few terms, that the router would answer without retrieval, or
+    that arrive while chat turns are queued are skipped.
+    """
+    message = request.message
+    if not settings.PREFETCH_ENABLED or settings.RETRIEVAL_MODE != "direct":
+        status = "disabled"
+    elif STARTUP is None or not STARTUP.done():
+        status = "not_ready"
+    elif len(set(tokenize(message))) < settings.PREFETCH_MIN_TERMS:
+        status = "too_short"
+    elif len(SCHEDULER):
+        status = "busy"
+    elif not _decide(SESSION_HISTORY.get_session(request.session_id), message).retrieve:
+        status = "no_retrieval"
+    else:
+        status = PREFETCH.start(
+            _prefetch_key(message),
+            request.session_id,
+            lambda: _prefetch_results(message),
+        )
+    PREFETCH_REQUESTS.inc(status=status)
+    return {"status": status}
+
+
+@app.post("/chat", response_model=None)
+async def chat(
+    request: ChatRequest, last_event_id: str | None = Header(default=None)
+) -> EventSourceResponse | JSONResponse:
     """Stream a multi-agent response as Server-Sent Events.
 
-    Each SSE frame carries an ``event`` type and a JSON ``data`` payload.
-    See ``SPECS.md §4.7`` for the full event schema.
+    Each SSE frame carries an ``id`` (``"<turn>:<seq>"``), an ``event`` type
+    and a JSON ``data`` payload. See ``SPECS.md §4.7`` for the full event
+    schema. A request with ``Last-Event-ID`` naming a buffered turn of the
+    same session resumes that turn after the given event instead of starting
+    a new one; any other ``Last-Event-ID`` gets 409 (the client starts over
+    without it). When admission control cannot start a new turn in time,
+    responds 429 with ``Retry-After``.
     """
-    return EventSourceResponse(
-        orchestrate(request.session_id, request.message),
-        media_type="text/event-stream",
+    session_id = request.session_id
+    if last_event_id:
+        resumed = REPLAY.resume(last_event_id, session_id)
+        if resumed is not None:
+            turn, seq = resumed
+            logger.info("Resuming turn %s after event %d", turn.id, seq)
+            return EventSourceResponse(
+                _follow(turn, seq), media_type="text/event-stream"
+            )
+        # Expired, from another session, or buffered by another worker:
+        # starting a new turn here would re-run it under the partial reply
+        logger.info("Cannot resume %s", last_event_id)
+        return JSONResponse(
+            {"detail": "Turn cannot be resumed", "reason": "unknown_turn"},
+            status_code=409,
+        )
+
+    priority = _priority(session_id, request.message)
+    path = "A" if priority == PATH_A else "B"
+    try:
+        waited = await SCHEDULER.acquire(session_id, priority)
+    except Overloaded as exc:
+        CHAT_REJECTED.inc(reason=exc.reason)
+        logger.warning("Rejected chat session=%s: %s", session_id, exc)
+        return JSONResponse(
+            {"detail": "Server busy, retry later", "reason": exc.reason},
+            status_code=429,
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+    ADMISSION_WAIT_SECONDS.observe(waited, path=path)
+    admitted = time.perf_counter()
+
+    # The slot is held until the pipeline ends, not the connection
+    turn = _start_turn(
+        session_id,
+        request.message,
+        lambda: SCHEDULER.release(session_id, priority, time.perf_counter() - admitted),
     )
+    return EventSourceResponse(_follow(turn), media_type="text/event-stream")
@@ -0,0 +1,179 @@
+"""Precomputed "Source of Truth" summaries for topics spanning Notion and Slack.
+
+The Synthesizer's reconciliation of a Notion spec against later Slack
+decisions only changes when the data does. A background job finds topics
+present in both sources (:func:`app.tools.cross_source_topics`), retrieves
+their passages exactly as a chat turn would, and has the Synthesizer
+summarise each one. A turn whose question matches a topic is then served the
+stored summary and passages instead of retrieval and a Synthesizer call.
+Questions that mention dates are never matched: a summary covers all time.
+
+A summary stays valid across corpus versions until one of its title's or
+the question's terms is touched by a data change
+(:meth:`app.corpus.CorpusManager.changed_since`); only those topics are
+rebuilt when the corpus changes.
+
+Summaries are also written to the shared storage keyed on their input, so a
+topic whose passages did not change across a data update — or that another
+worker already summarised — is not sent to the Synthesizer again.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable
+
+from .cache import make_key
+from .index import tokenize
+from .storage import Storage
+from .temporal import mentions_dates
+
+logger = logging.getLogger(__name__)
+
+_NAMESPACE = "materialized"
+
+
+@dataclass(frozen=True)
+class Topic:
+    title: str
+    title_terms: frozenset[str]
+    terms: frozenset[str]  # every index term of the topic's passages
+    context: str  # the topic's passages, as assembled for the Synthesizer
+    summary: str
+    version: int  # corpus version it was built against
+
+
+class Materializer:
+    """Keeps one Source of Truth summary per hot topic for the current corpus.
+
+    *topics* lists candidate topic titles (best first); *retrieve* returns
+    the assembled Synthesizer input for a query and *synthesize* turns that
+    into a summary. A question matches a topic when it shares a term with
+    the topic's title and at least *min_coverage* of its terms occur in the
+    topic's passages. *changed_since(terms, version)* reports whether any of
+    *terms* changed in the corpus after *version*.
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        topics: Callable[[int], list[str]],
+        retrieve: Callable[[str], str],
+        synthesize: Callable[[str], Awaitable[str]],
+        changed_since: Callable[[Iterable[str], int], bool],
+        max_topics: int,
+        min_coverage: float,
+        concurrency: int = 2,
+    ) -> None:
+        self.storage = storage
+        self._topics_fn = topics
+        self._retrieve = retrieve
+        self._synthesize = synthesize
+        self._changed_since = changed_since
+        self.max_topics = max_topics
+        self.min_coverage = min_coverage
+        self.concurrency = concurrency
+        self.version: int | None = None
+        self.topics: list[Topic] = []
+        self.hits = 0
+        self.misses = 0
+        self.synthesized = 0
+        self.reused = 0
+        storage.set_capacity(_NAMESPACE, max(4 * max_topics, 64))
+
+    def lookup(self, query: str) -> Topic | None:
+        """The best up-to-date topic matching *query*, if any."""
+        terms = set(tokenize(query))
+        if not terms or not self.topics or mentions_dates(query):
+            self.misses += 1
+            return None
+        best: tuple[int, float] | None = None
+        match = None
+        for topic in self.topics:
+            title_overlap = len(terms & topic.title_terms)
+            if not title_overlap:
+                continue
+            coverage = len(terms & topic.terms) / len(terms)
+            if coverage < self.min_coverage:
+                continue
+            if self._changed_since(topic.title_terms | terms, topic.version):
+                continue
+            if best is None or (title_overlap, coverage) > best:
+                best, match = (title_overlap, coverage), topic
+        if match is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return match
+
+    async def refresh(self, version: int) -> None:
+        """Bring the topic summaries up to date with corpus *version*.
+
+        Topics whose title terms did not change since they were built are
+        kept as they are.
+        """
+        titles = await asyncio.to_thread(self._topics_fn, self.max_topics)
+        current = {topic.title: topic for topic in self.topics}
+        limit = asyncio.Semaphore(self.concurrency)
+
+        async def build(title: str) -> Topic | None:
+            topic = current.get(title)
+            if topic is not None and not self._changed_since(
+                topic.title_terms, topic.version
+            ):
+                return topic
+            context = await asyncio.to_thread(self._retrieve, title)
+            key = make_key(title, context)
+            summary = self.storage.get(_NAMESPACE, key)
+            if summary is None:
+                async with limit:
+                    summary = await self._synthesize(context)
+                if not summary:
+                    return None
+                self.storage.put(_NAMESPACE, key, summary)
+                self.synthesized += 1
+            else:
+                self.reused += 1
+            return Topic(
+                title=title,
+                title_terms=frozenset(tokenize(title)),
+                terms=frozenset(tokenize(f"{title}\n{context}")),
+                context=context,
+                summary=summary,
+                version=version,
+            )
+
+        results = await asyncio.gather(
+            *(build(title) for title in titles), return_exceptions=True
+        )
+        topics = []
+        for title, result in zip(titles, results):
+            if isinstance(result, BaseException):
+                logger.warning("Materializing %r failed: %s", title, result)
+            elif result is not None:
+                topics.append(result)
+        self.topics, self.version = topics, version
+        logger.info(
+            "Materialized %d topic summaries for corpus v%d", len(topics), version
+        )
+
+    async def run(self, version: Callable[[], int], interval: float) -> None:
+        """Refresh whenever the corpus version changes (checked every *interval*)."""
+        while True:
+            current = version()
+            if current != self.version:
+                try:
+                    await self.refresh(current)
+                except Exception:
+                    logger.exception("Materialization failed")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "version": self.version,
+            "topics": len(self.topics),
+            "hits": self.hits,
+            "misses": self.misses,
+            "synthesized": self.synthesized,
+            "reused": self.reused,
+        }
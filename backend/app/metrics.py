@@ -0,0 +1,281 @@
+"""Minimal Prometheus instrumentation: counters, histograms and stage spans.
+
+Metrics are rendered in the Prometheus text exposition format on
+``GET /metrics``. :func:`span` times a pipeline stage into
+``chaoscontext_stage_duration_seconds`` and, when a turn is being traced,
+into that turn's timing breakdown (sent as the optional ``timing`` SSE event).
+"""
+
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+LabelValues = tuple[str, ...]
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, **extra: str) -> str:
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+# ---------------------------------------------------------------------------
+# Metric types
+# ---------------------------------------------------------------------------
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = _DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = (*sorted(buckets), math.inf)
+        # label values → (per-bucket counts, sum, count)
+        self._values: dict[LabelValues, tuple[list[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, n = self._values.get(key) or ([0] * len(self.buckets), 0, 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value, n + 1)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = [(k, (list(c), s, n)) for k, (c, s, n) in self._values.items()]
+        for key, (counts, total, n) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, le=_format_value(bound))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {n}"
+
+
+class Collector(_Metric):
+    """Metric whose labelled values are read from *fn* at scrape time.
+
+    Used to export counters that other components already keep (cache hits,
+    coalesced flights, ...) without double bookkeeping.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        fn: Callable[[], dict[LabelValues, float]],
+        labelnames: tuple[str, ...] = (),
+        kind: str = "gauge",
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.kind = kind
+        self._fn = fn
+
+    def samples(self) -> Iterator[str]:
+        for key, value in self._fn().items():
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> None:
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ---------------------------------------------------------------------------
+# Application metrics
+# ---------------------------------------------------------------------------
+
+CHAT_TURNS = Counter(
+    "chaoscontext_chat_turns_total", "Chat turns by routing path.", ("path",)
+)
+CHAT_ERRORS = Counter("chaoscontext_chat_errors_total", "Chat turns that failed.")
+STAGE_SECONDS = Histogram(
+    "chaoscontext_stage_duration_seconds",
+    "Wall-clock time spent in each pipeline stage.",
+    ("stage",),
+)
+TOOL_SECONDS = Histogram(
+    "chaoscontext_tool_duration_seconds", "execute_tool latency per tool.", ("tool",)
+)
+TOOL_FAILURES = Counter(
+    "chaoscontext_tool_failures_total",
+    "Tool calls answered with a placeholder, by tool and reason (timeout/error).",
+    ("tool", "reason"),
+)
+UPSTREAM_RETRIES = Counter(
+    "chaoscontext_upstream_retries_total",
+    "Upstream (Mistral) requests retried, per agent and reason.",
+    ("agent", "reason"),
+)
+UPSTREAM_HEDGES = Counter(
+    "chaoscontext_upstream_hedges_total",
+    "Hedged upstream requests sent, and those that answered first, per agent.",
+    ("agent", "outcome"),
+)
+DEADLINES_EXCEEDED = Counter(
+    "chaoscontext_deadline_exceeded_total",
+    "Pipeline stages aborted at their deadline, per stage.",
+    ("stage",),
+)
+TTFT_SECONDS = Histogram(
+    "chaoscontext_time_to_first_token_seconds",
+    "Time from stream request to first streamed content, per agent.",
+    ("agent",),
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    "chaoscontext_sse_queue_wait_seconds",
+    "Time an SSE event waits in the per-request queue before being sent.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+)
+AGENT_TOKENS = Counter(
+    "chaoscontext_agent_tokens_total",
+    "Tokens reported by Mistral usage, per agent and kind (prompt/completion).",
+    ("agent", "kind"),
+)
+ROUTER_DECISIONS = Counter(
+    "chaoscontext_router_decisions_total",
+    "Retrieval router decisions by path and reason.",
+    ("path", "reason"),
+)
+CHAT_REJECTED = Counter(
+    "chaoscontext_chat_rejected_total",
+    "Chat requests rejected by admission control (HTTP 429), by reason.",
+    ("reason",),
+)
+PREFETCH_REQUESTS = Counter(
+    "chaoscontext_prefetch_requests_total",
+    "Draft prefetch requests, by outcome (started, cached, busy, ...).",
+    ("status",),
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "chaoscontext_admission_wait_seconds",
+    "Time a chat request waited for an admission slot, by expected path.",
+    ("path",),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10),
+)
+AGENT_CHUNKS = Counter(
+    "chaoscontext_agent_stream_chunks_total",
+    "Streamed content deltas received per agent.",
+    ("agent",),
+)
+
+
+# ---------------------------------------------------------------------------
+# Spans
+# ---------------------------------------------------------------------------
+
+# Per-turn stage timings (ms); set by the orchestrator for the timing event
+TURN_TIMINGS: ContextVar[dict[str, float] | None] = ContextVar(
+    "turn_timings", default=None
+)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = TURN_TIMINGS.get()
+    if timings is not None:
+        timings[stage] = round(timings.get(stage, 0.0) + seconds * 1000, 3)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time the enclosed block as pipeline *stage*."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        record_stage(stage, elapsed)
+        logger.debug("span %s took %.1f ms", stage, elapsed * 1000)
+
+
+def record_usage(agent: str, usage: object | None) -> None:
+    """Add a Mistral ``UsageInfo`` to the per-agent token counters."""
+    if usage is None:
+        return
+    for kind in ("prompt", "completion"):
+        tokens = getattr(usage, f"{kind}_tokens", None)
+        if tokens:
+            AGENT_TOKENS.inc(tokens, agent=agent, kind=kind)
@@ -0,0 +1,296 @@
+"""Passage chunking and Synthesizer context assembly.
+
+Documents are split into sentence-aligned passages of at most
+``PASSAGE_MAX_TOKENS`` when a source is indexed, and the tools return the
+best passages rather than whole documents (optionally fused with dense
+retrieval, see ``app/dense.py``, and filtered and weighted by date, see
+``app/temporal.py``). :func:`assemble_context` then
+merges the per-source results into the Synthesizer prompt: deduplicated
+across sources and cut to ``SYNTHESIS_INPUT_TOKEN_BUDGET``.
+"""
+
+import heapq
+import re
+from array import array
+from typing import Iterator, NamedTuple
+
+from .dense import DenseIndex
+from .index import InvertedIndex, tokenize
+from .sessions import CHARS_PER_TOKEN, estimate_tokens
+from .temporal import UNDATED, TimeIndex, recency_factor
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+# Passages whose index terms overlap at least this much are duplicates
+_DUPLICATE_JACCARD = 0.8
+
+# Hybrid search: candidates taken from each ranking, and the reciprocal rank
+# fusion constant (score = sum of 1 / (_RRF_K + rank))
+_FUSION_CANDIDATES = 50
+_RRF_K = 60
+
+# Candidates re-ranked by recency
+_RECENCY_CANDIDATES = 50
+
+# ---------------------------------------------------------------------------
+# Chunking
+# ---------------------------------------------------------------------------
+
+
+def _sentences(text: str) -> Iterator[tuple[int, int]]:
+    """``(start, end)`` of each sentence, surrounding whitespace excluded."""
+    pos = 0
+    for m in [*_SENTENCE_RE.finditer(text), None]:
+        start, end = pos, m.start() if m else len(text)
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start < end:
+            yield start, end
+        if m:
+            pos = m.end()
+
+
+def chunk(text: str, max_chars: int) -> list[tuple[int, int]]:
+    """Split *text* into ``(start, end)`` spans of whole sentences.
+
+    Consecutive sentences are packed into spans of at most *max_chars*; a
+    single longer sentence is split at whitespace.
+    """
+    spans: list[tuple[int, int]] = []
+    start = end = -1
+    for s, e in _sentences(text):
+        while e - s > max_chars:
+            cut = text.rfind(" ", s, s + max_chars)
+            if cut <= s:
+                cut = s + max_chars
+            if start >= 0:
+                spans.append((start, end))
+                start = -1
+            spans.append((s, cut))
+            s = cut
+            while s < e and text[s].isspace():
+                s += 1
+        if s >= e:
+            continue
+        if start >= 0 and e - start <= max_chars:
+            end = e
+        else:
+            if start >= 0:
+                spans.append((start, end))
+            start, end = s, e
+    if start >= 0:
+        spans.append((start, end))
+    return spans
+
+
+def clean(text: str) -> str:
+    """Collapse whitespace so a passage fits on one line."""
+    return " ".join(text.split())
+
+
+# ---------------------------------------------------------------------------
+# Passage index
+# ---------------------------------------------------------------------------
+
+
+class Passage(NamedTuple):
+    doc_id: int
+    start: int
+    end: int
+    score: float
+
+
+class PassageIndex:
+    """BM25 over passages; hits map back to ``(doc_id, span)``.
+
+    Each passage is indexed together with its document's *title*, so title
+    terms still match every passage of the document. Passage boundaries are
+    kept in flat arrays (12 bytes per passage, plus 4 per document id).
+    Removing a document unindexes its passages; their ids are not reused.
+
+    With a *dense* index, :meth:`embed` gives a document's passages dense
+    vectors (once its terms are indexed, so their IDF is meaningful) and
+    :meth:`search` fuses both rankings.
+
+    Passages also carry their document's date (a day ordinal): searches can
+    be restricted to a date window, which prunes passages before scoring,
+    and scores are weighted by recency — with *recency_weight* ``w``, a
+    passage *half_life_days* older than the newest candidate keeps
+    ``1 - w/2`` of its score.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        dense: DenseIndex | None = None,
+        dense_min_score: float = 0.0,
+        recency_weight: float = 0.0,
+        half_life_days: float = 30.0,
+    ) -> None:
+        self.max_chars = max_tokens * CHARS_PER_TOKEN
+        self.dense = dense
+        self.dense_min_score = dense_min_score
+        self.recency_weight = recency_weight
+        self.half_life_days = half_life_days
+        self.dates = TimeIndex()
+        self._index = InvertedIndex()
+        self._doc = array("I")
+        self._start = array("I")
+        self._end = array("I")
+        self._first = array("I")  # doc id → id of its first passage
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._index
+
+    def add(self, doc_id: int, text: str, title: str = "", day: int = UNDATED) -> None:
+        """Index *doc_id*'s passages, dated *day* (a day ordinal)."""
+        if doc_id >= len(self._first):
+            self._first.extend(bytes(doc_id + 1 - len(self._first)))
+        self._first[doc_id] = len(self._doc)
+        for start, end in self._spans(text):
+            passage_id = len(self._doc)
+            self._doc.append(doc_id)
+            self._start.append(start)
+            self._end.append(end)
+            self._index.add(passage_id, f"{title} {text[start:end]}")
+            self.dates.add(passage_id, day)
+
+    def embed(self, doc_id: int, text: str, title: str = "") -> None:
+        """Compute the dense vectors of *doc_id*'s passages."""
+        if self.dense is None:
+            return
+        first = self._first[doc_id]
+        for i, (start, end) in enumerate(self._spans(text)):
+            vector = self.dense.embed(f"{title} {text[start:end]}", self._index.idf)
+            self.dense.set(first + i, vector)
+
+    def remove(self, doc_id: int, text: str, title: str = "") -> None:
+        """Unindex *doc_id*, which must have been added with *text*/*title*."""
+        first = self._first[doc_id]
+        for i, (start, end) in enumerate(self._spans(text)):
+            self._index.remove(first + i, f"{title} {text[start:end]}")
+            self.dates.remove(first + i)
+            if self.dense is not None:
+                self.dense.clear(first + i)
+
+    def _spans(self, text: str) -> list[tuple[int, int]]:
+        return chunk(text, self.max_chars) or [(0, 0)]
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        dense: bool = True,
+        since: int | None = None,
+        until: int | None = None,
+        recency: bool = True,
+    ) -> list[Passage]:
+        """Return up to *k* passages dated within ``[since, until]``, best first.
+
+        Scores are BM25, or reciprocal-rank-fusion scores when the dense
+        index takes part (only comparable within one result list), times
+        the recency factor unless *recency* is off.
+        """
+        allowed = self.dates.window(since, until)
+        if allowed is not None and not allowed:
+            return []
+        recency = recency and self.recency_weight > 0
+        n = max(k, _RECENCY_CANDIDATES) if recency else k
+        if self.dense is None or not dense:
+            hits = self._index.search(query, n, allowed)
+        else:
+            lexical = self._index.search(query, max(n, _FUSION_CANDIDATES), allowed)
+            semantic = self.dense.search(
+                self.dense.embed(query, self._query_idf),
+                max(n, _FUSION_CANDIDATES),
+                self.dense_min_score,
+                allowed,
+            )
+            fused: dict[int, float] = {}
+            for ranking in (lexical, semantic):
+                for rank, (pid, _) in enumerate(ranking):
+                    fused[pid] = fused.get(pid, 0.0) + 1.0 / (_RRF_K + rank + 1)
+            hits = heapq.nlargest(n, fused.items(), key=lambda item: item[1])
+        if recency:
+            hits = self._by_recency(hits, k)
+        return [
+            Passage(self._doc[pid], self._start[pid], self._end[pid], score)
+            for pid, score in hits
+        ]
+
+    def _query_idf(self, term: str) -> float:
+        # A query term no passage contains has the highest IDF of all and
+        # would swamp the terms that can match, so it is left out
+        return self._index.idf(term) if term in self._index else 0.0
+
+    def _by_recency(
+        self, hits: list[tuple[int, float]], k: int
+    ) -> list[tuple[int, float]]:
+        """The *k* best *hits* once scores are weighted by recency."""
+        newest = self.dates.newest(pid for pid, _ in hits)
+        weighted = []
+        for pid, score in hits:
+            day = self.dates.day(pid)
+            factor = (
+                1.0 - self.recency_weight
+                if day == UNDATED
+                else recency_factor(
+                    newest - day, self.recency_weight, self.half_life_days
+                )
+            )
+            weighted.append((pid, score * factor))
+        return heapq.nlargest(k, weighted, key=lambda item: item[1])
+
+
+# ---------------------------------------------------------------------------
+# Context assembly
+# ---------------------------------------------------------------------------
+
+
+def _jaccard(a: set[str], b: set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def assemble_context(results: list[str], token_budget: int) -> str:
+    """Merge tool *results* into one Synthesizer input.
+
+    Each result holds one passage per line, best first. Lines are taken
+    round-robin across results, so every source keeps its best passages;
+    near-duplicates of an already chosen passage (from any source) are
+    dropped (lines without a ``[Source | ...]`` header never are), and lines
+    that would exceed *token_budget* estimated tokens are skipped. Chosen
+    lines are returned grouped per result, in rank order.
+    """
+    queues = [[line for line in r.splitlines() if line.strip()] for r in results]
+    chosen: list[list[str]] = [[] for _ in results]
+    seen: list[set[str]] = []
+    used = 0
+
+    for rank in range(max(map(len, queues), default=0)):
+        for i, lines in enumerate(queues):
+            if rank >= len(lines):
+                continue
+            line = lines[rank]
+            # Only passages ("[Source | ...] body") are deduplicated, on their
+            # bodies: a source's "nothing found" or failure line must stay
+            # even when another source's reads almost the same
+            passage = line.startswith("[") and "] " in line
+            terms = set(tokenize(line.split("] ", 1)[1])) if passage else set()
+            if passage and any(
+                _jaccard(terms, other) >= _DUPLICATE_JACCARD for other in seen
+            ):
+                continue
+            cost = estimate_tokens(line)
+            if used + cost > token_budget:
+                continue
+            used += cost
+            if passage:
+                seen.append(terms)
+            chosen[i].append(line)
+
+    return "\n\n".join("\n".join(lines) for lines in chosen if lines)
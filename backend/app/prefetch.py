@@ -0,0 +1,129 @@
+"""Speculative retrieval for messages the user is still typing.
+
+The frontend posts the draft to ``/prefetch`` (debounced). When the router
+would retrieve for it, every tool runs on the draft in the background and
+the per-tool results are kept here for a short TTL, keyed on the normalized
+query and corpus version. When the message is sent, the turn takes the
+results from here — waiting for a prefetch still in flight — instead of
+searching again, so retrieval is off the critical path of ``/chat``.
+
+Abandoned prefetches stay cheap: a session has at most one in flight (a
+newer draft cancels the older one), the number in flight is bounded
+overall, and finished results are bounded in count and age.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+Results = dict[str, str]  # tool name → result
+
+
+@dataclass
+class _Entry:
+    task: asyncio.Task[Results]
+    session_id: str | None  # owner while in flight and not yet taken
+    created_at: float
+
+
+class PrefetchCache:
+    """Background retrievals for draft messages, by query key."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int, max_inflight: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_inflight = max_inflight
+        self.hits = 0
+        self.misses = 0
+        self.cancelled = 0
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._sessions: dict[str, str] = {}  # session → key of its prefetch
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def start(
+        self, key: str, session_id: str, fetch: Callable[[], Awaitable[Results]]
+    ) -> str:
+        """Prefetch *key* for *session_id* unless already cached or too busy.
+
+        Returns ``"started"``, ``"cached"`` (done or in flight) or
+        ``"busy"``. A session's previous unfinished prefetch is cancelled.
+        """
+        self._prune()
+        if key in self._entries:
+            return "cached"
+        previous = self._sessions.pop(session_id, None)
+        if previous is not None:
+            self._cancel(previous)
+        if self._inflight() >= self.max_inflight:
+            return "busy"
+        task = asyncio.create_task(fetch())
+        self._entries[key] = _Entry(task, session_id, time.monotonic())
+        self._sessions[session_id] = key
+        task.add_done_callback(lambda t: self._finished(key, t))
+        return "started"
+
+    async def take(self, key: str) -> Results | None:
+        """The prefetched results for *key*, awaiting one still in flight."""
+        self._prune()
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.session_id is not None:
+            # Taken by a turn: no longer the session's draft to cancel
+            self._sessions.pop(entry.session_id, None)
+            entry.session_id = None
+        try:
+            results = await asyncio.shield(entry.task)
+        except asyncio.CancelledError:
+            if not entry.task.cancelled():
+                raise  # the turn itself was cancelled
+            self.misses += 1
+            return None
+        except Exception:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return results
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "inflight": self._inflight(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "cancelled": self.cancelled,
+        }
+
+    # -- internals ---------------------------------------------------------
+
+    def _inflight(self) -> int:
+        return sum(not entry.task.done() for entry in self._entries.values())
+
+    def _cancel(self, key: str) -> None:
+        entry = self._entries.get(key)
+        if entry is not None and not entry.task.done():
+            del self._entries[key]
+            entry.task.cancel()
+            self.cancelled += 1
+
+    def _finished(self, key: str, task: asyncio.Task[Results]) -> None:
+        entry = self._entries.get(key)
+        if entry is None or entry.task is not task:
+            return
+        if entry.session_id is not None and self._sessions.get(entry.session_id) == key:
+            del self._sessions[entry.session_id]
+            entry.session_id = None
+        if task.cancelled() or task.exception() is not None:
+            del self._entries[key]
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for key, entry in list(self._entries.items()):
+            expired = now - entry.created_at > self.ttl_seconds
+            if entry.task.done() and (expired or len(self._entries) > self.max_entries):
+                del self._entries[key]
@@ -0,0 +1,154 @@
+"""Per-turn SSE event buffers, so a dropped stream can resume.
+
+Every chat turn gets a :class:`Turn`: the pipeline appends its events there
+(each tagged with the SSE id ``"<turn id>:<seq>"``) and any number of
+readers follow it from a given sequence number. A client that reconnects
+with ``Last-Event-ID`` is replayed the events it missed and then follows the
+still-running pipeline — nothing is re-run.
+
+The pipeline no longer dies with its connection: when the last reader
+detaches it keeps running for a grace period, and is cancelled only if
+nobody re-attaches in time. Finished turns stay replayable for a TTL.
+"""
+
+import asyncio
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+
+class Turn:
+    """The buffered SSE events of one chat turn."""
+
+    def __init__(self, turn_id: str, session_id: str, max_lag: int) -> None:
+        self.id = turn_id
+        self.session_id = session_id
+        self.max_lag = max_lag
+        self.events: list[tuple[float, dict[str, str]]] = []  # (appended at, frame)
+        self.done = False
+        self.finished_at: float | None = None
+        self.task: asyncio.Task[Any] | None = None
+        self._readers: dict[object, int] = {}  # reader → events delivered
+        self._appended = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._abandon: asyncio.TimerHandle | None = None
+
+    async def put(self, frame: dict[str, str]) -> None:
+        """Append an SSE *frame*, assigning its id.
+
+        Blocks while an attached reader is more than *max_lag* events
+        behind, so a slow client still applies backpressure to the pipeline.
+        """
+        self.events.append(
+            (time.perf_counter(), {"id": f"{self.id}:{len(self.events) + 1}", **frame})
+        )
+        self._wake()
+        while (
+            self._readers
+            and len(self.events) - min(self._readers.values()) > self.max_lag
+        ):
+            self._drained.clear()
+            await self._drained.wait()
+
+    def finish(self) -> None:
+        """Mark the turn complete; readers end after the last event."""
+        self.done = True
+        self.finished_at = time.monotonic()
+        if self._abandon is not None:
+            self._abandon.cancel()
+        self._wake()
+
+    async def follow(
+        self, after: int, grace_seconds: float
+    ) -> AsyncIterator[tuple[float, dict[str, str]]]:
+        """Yield ``(appended at, frame)`` for every event after seq *after*.
+
+        Live events are yielded as they arrive until the turn is done. If
+        this was the last reader and the turn is still running when the
+        iterator is closed, the pipeline is cancelled after *grace_seconds*
+        unless another reader attaches first.
+        """
+        reader = object()
+        position = max(0, min(after, len(self.events)))
+        self._readers[reader] = position
+        if self._abandon is not None:
+            self._abandon.cancel()
+            self._abandon = None
+        try:
+            while True:
+                while position < len(self.events):
+                    item = self.events[position]
+                    position += 1
+                    self._readers[reader] = position
+                    self._drained.set()
+                    yield item
+                if self.done:
+                    return
+                appended = self._appended
+                await appended.wait()
+        finally:
+            del self._readers[reader]
+            self._drained.set()
+            if not self._readers and not self.done:
+                self._abandon = asyncio.get_running_loop().call_later(
+                    grace_seconds, self._cancel
+                )
+
+    def _wake(self) -> None:
+        self._appended.set()
+        self._appended = asyncio.Event()
+
+    def _cancel(self) -> None:
+        self._abandon = None
+        if self._readers or self.task is None or self.task.done():
+            return
+        logger.info("Turn %s abandoned by its client; cancelling", self.id)
+        self.task.cancel()
+
+
+class ReplayBuffer:
+    """Registry of recent turns, bounded in count and by a TTL after finish."""
+
+    def __init__(self, ttl_seconds: float, max_turns: int, max_lag: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_turns = max_turns
+        self.max_lag = max_lag
+        self.resumed = 0
+        self._turns: OrderedDict[str, Turn] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    def create(self, session_id: str) -> Turn:
+        self._prune()
+        turn = Turn(secrets.token_hex(8), session_id, self.max_lag)
+        self._turns[turn.id] = turn
+        return turn
+
+    def resume(self, last_event_id: str, session_id: str) -> tuple[Turn, int] | None:
+        """The turn and seq a ``Last-Event-ID`` refers to, if still buffered."""
+        self._prune()
+        turn_id, _, seq = last_event_id.partition(":")
+        turn = self._turns.get(turn_id)
+        if turn is None or turn.session_id != session_id or not seq.isdigit():
+            return None
+        self.resumed += 1
+        return turn, int(seq)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "turns": len(self._turns),
+            "running": sum(not t.done for t in self._turns.values()),
+            "resumed": self.resumed,
+        }
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for turn_id, turn in list(self._turns.items()):
+            expired = turn.done and now - (turn.finished_at or now) > self.ttl_seconds
+            if expired or (len(self._turns) >= self.max_turns and turn.done):
+                del self._turns[turn_id]
@@ -0,0 +1,111 @@
+"""Per-turn retrieval routing: Path A (answer from history) vs Path B (retrieve).
+
+The first turn of a conversation always retrieves (there is no history to
+answer from). Later turns get a cheap local decision — regexes plus set
+lookups, no LLM call — made from:
+
+- the message's class: small talk, a follow-up about the previous answer,
+  or an explicit request for fresh/authoritative data;
+- lexical coverage: how many of the message's index terms already appear in
+  the conversation (questions, replies and previously retrieved data);
+- whether the terms that are new to the conversation occur in the corpus at
+  all (retrieving on terms no source contains cannot find anything).
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from .index import tokenize
+
+_SMALL_TALK = frozenset(
+    """
+    hi hello hey yo thanks thank thx ty ok okay k cool great nice awesome
+    perfect got it bye goodbye cheers good morning afternoon evening night
+    sounds you so much very lol yes no yep nope sure alright
+    """.split()
+)
+
+_FOLLOW_UP_RE = re.compile(
+    r"\b(you (just )?(said|mentioned|wrote)|your (last |previous )?(answer|reply)"
+    r"|that answer|summari[sz]e|rephrase|elaborate|expand on|explain (that|this|it)"
+    r"|what do you mean|in other words|simpler|shorter|tl;?dr|why is that"
+    r"|say (that|it) again|go on)\b",
+    re.IGNORECASE,
+)
+
+_RETRIEVE_RE = re.compile(
+    r"\b(latest|current(ly)?|status|updates?|updated|recent(ly)?|changed?"
+    r"|decid(e|ed)|decisions?|specs?|docs?|documentation|notion|slack"
+    r"|who said|what did .{1,40} say|check|look up|search|find)\b",
+    re.IGNORECASE,
+)
+
+# Nudge applied to the coverage score by a follow-up / retrieval cue
+_CUE_WEIGHT = 0.3
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    retrieve: bool
+    confidence: float  # 0.5 (coin flip) .. 1.0
+    reason: str
+    coverage: float | None = None  # share of terms already in the conversation
+
+    @property
+    def path(self) -> str:
+        return "B" if self.retrieve else "A"
+
+
+def route(
+    message: str,
+    known_terms: Iterable[str],
+    has_history: bool,
+    corpus_terms: Callable[[set[str]], set[str]],
+    threshold: float = 0.6,
+) -> RouteDecision:
+    """Decide whether *message* needs fresh retrieval.
+
+    *known_terms* are the index terms already seen in the conversation;
+    *corpus_terms* filters a set of terms down to those present in any
+    source. A message is routed to retrieval when its coverage score
+    (adjusted by follow-up/retrieval cues) falls below *threshold*. Without
+    history, every message is routed to retrieval.
+    """
+    if not has_history:
+        return RouteDecision(True, 0.9, "new_conversation")
+
+    words = re.findall(r"[a-z']+", message.lower())
+    if words and all(w in _SMALL_TALK for w in words):
+        return RouteDecision(False, 0.95, "small_talk")
+
+    terms = set(tokenize(message))
+    if not terms:
+        return RouteDecision(False, 0.9, "no_terms")
+
+    novel = terms - set(known_terms)
+    searchable = corpus_terms(novel) if novel else set()
+    coverage = 1.0 - len(novel) / len(terms)
+
+    if not searchable:
+        # Nothing new that retrieval could find
+        reason = "covered_by_history" if not novel else "no_corpus_match"
+        return RouteDecision(
+            False, 0.9 if not novel else 0.7, reason, round(coverage, 3)
+        )
+
+    score = coverage
+    follow_up = bool(_FOLLOW_UP_RE.search(message))
+    wants_data = bool(_RETRIEVE_RE.search(message))
+    if follow_up:
+        score += _CUE_WEIGHT
+    if wants_data:
+        score -= _CUE_WEIGHT
+
+    retrieve = score < threshold
+    if retrieve:
+        reason = "data_request" if wants_data and coverage >= threshold else "new_topic"
+    else:
+        reason = "follow_up" if follow_up else "covered_by_history"
+    confidence = min(1.0, 0.5 + abs(score - threshold))
+    return RouteDecision(retrieve, round(confidence, 3), reason, round(coverage, 3))
@@ -0,0 +1,192 @@
+"""Admission control for chat turns.
+
+Every ``/chat`` request must take a slot before its pipeline starts. Slots
+are bounded globally (upstream LLM concurrency) and per session (one user
+cannot occupy them all). Requests that cannot start immediately wait in a
+bounded queue ordered by priority — cheap Path A turns before full Path B
+pipelines, FIFO within a priority — and are rejected with
+:class:`Overloaded` (→ HTTP 429 + ``Retry-After``) when the queue is full or
+their wait exceeds the limit.
+
+Single event loop only: all state is touched from coroutines, so no locks.
+"""
+
+import asyncio
+import bisect
+import itertools
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+# Priorities (lower runs first)
+PATH_A = 0
+PATH_B = 1
+
+# Smoothing of the per-priority slot hold time behind Retry-After estimates
+_EWMA_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """No slot could be granted; retry after *retry_after* seconds."""
+
+    def __init__(self, reason: str, retry_after: int) -> None:
+        super().__init__(f"overloaded ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    session_id: str = field(compare=False)
+    granted: asyncio.Future[None] = field(compare=False)
+
+
+class Scheduler:
+    """Priority admission queue with global and per-session slot limits."""
+
+    def __init__(
+        self,
+        max_active: int,
+        max_per_session: int,
+        max_queued: int,
+        max_wait_seconds: float,
+    ) -> None:
+        self.max_active = max_active
+        self.max_per_session = max_per_session
+        self.max_queued = max_queued
+        self.max_wait_seconds = max_wait_seconds
+        self.active = 0
+        self.admitted = 0
+        self.queued_total = 0
+        self.rejected: dict[str, int] = {"queue_full": 0, "session": 0, "timeout": 0}
+        self._sessions: dict[str, int] = {}  # session → active + waiting
+        self._running: dict[str, int] = {}  # session → active
+        self._waiting: list[_Waiter] = []  # sorted: priority, then arrival
+        self._seq = itertools.count()
+        self._hold_seconds = {PATH_A: 1.0, PATH_B: 5.0}
+
+    def __len__(self) -> int:
+        """Number of queued (not yet admitted) requests."""
+        return len(self._waiting)
+
+    async def acquire(self, session_id: str, priority: int) -> float:
+        """Wait for a slot; returns the time spent queued (s).
+
+        Raises :class:`Overloaded` if the request cannot be admitted within
+        ``max_wait_seconds``. Every successful call must be paired with
+        :meth:`release`.
+        """
+        if self._sessions.get(session_id, 0) >= 2 * self.max_per_session:
+            # The session already has its slots busy and as many turns queued
+            raise self._reject("session")
+        if not self._waiting and self._can_run(session_id):
+            self._start(session_id)
+            return 0.0
+        if len(self._waiting) >= self.max_queued:
+            raise self._reject("queue_full")
+
+        waiter = _Waiter(
+            priority,
+            next(self._seq),
+            session_id,
+            asyncio.get_running_loop().create_future(),
+        )
+        bisect.insort(self._waiting, waiter)
+        self._sessions[session_id] = self._sessions.get(session_id, 0) + 1
+        self.queued_total += 1
+        self._dispatch()  # free slots may be blocked only by other sessions
+        start = time.monotonic()
+        try:
+            await asyncio.wait({waiter.granted}, timeout=self.max_wait_seconds)
+        except asyncio.CancelledError:
+            if waiter.granted.done():
+                self.release(session_id)  # granted just as the client left
+            else:
+                self._withdraw(waiter)
+            raise
+        if not waiter.granted.done():
+            self._withdraw(waiter)
+            raise self._reject("timeout")
+        return time.monotonic() - start
+
+    def release(
+        self, session_id: str, priority: int | None = None, held: float = 0.0
+    ) -> None:
+        """Free a slot taken by :meth:`acquire` and admit queued requests.
+
+        *priority*/*held* (slot hold time, s) feed the ``Retry-After``
+        estimate.
+        """
+        self.active -= 1
+        self._running[session_id] -= 1
+        if not self._running[session_id]:
+            del self._running[session_id]
+        self._leave(session_id)
+        if priority is not None:
+            avg = self._hold_seconds[priority]
+            self._hold_seconds[priority] = avg + _EWMA_ALPHA * (held - avg)
+        self._dispatch()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "active": self.active,
+            "queued": len(self._waiting),
+            "admitted": self.admitted,
+            "queued_total": self.queued_total,
+            "rejected": dict(self.rejected),
+            "hold_seconds": {
+                "A": round(self._hold_seconds[PATH_A], 3),
+                "B": round(self._hold_seconds[PATH_B], 3),
+            },
+        }
+
+    # -- internals ---------------------------------------------------------
+
+    def _can_run(self, session_id: str) -> bool:
+        return (
+            self.active < self.max_active
+            and self._running.get(session_id, 0) < self.max_per_session
+        )
+
+    def _start(self, session_id: str, queued: bool = False) -> None:
+        self.active += 1
+        self.admitted += 1
+        self._running[session_id] = self._running.get(session_id, 0) + 1
+        if not queued:
+            self._sessions[session_id] = self._sessions.get(session_id, 0) + 1
+
+    def _dispatch(self) -> None:
+        """Admit waiters in priority order, skipping sessions at their limit."""
+        i = 0
+        while i < len(self._waiting) and self.active < self.max_active:
+            waiter = self._waiting[i]
+            if not self._can_run(waiter.session_id):
+                i += 1
+                continue
+            del self._waiting[i]
+            self._start(waiter.session_id, queued=True)
+            waiter.granted.set_result(None)
+
+    def _withdraw(self, waiter: _Waiter) -> None:
+        index = bisect.bisect_left(self._waiting, waiter)
+        if index < len(self._waiting) and self._waiting[index] is waiter:
+            del self._waiting[index]
+        self._leave(waiter.session_id)
+
+    def _leave(self, session_id: str) -> None:
+        self._sessions[session_id] -= 1
+        if not self._sessions[session_id]:
+            del self._sessions[session_id]
+
+    def _retry_after(self) -> int:
+        """Seconds until the current queue has likely drained."""
+        work = sum(self._hold_seconds[w.priority] for w in self._waiting)
+        work += self._hold_seconds[PATH_B]  # this request
+        return max(1, math.ceil(work / self.max_active))
+
+    def _reject(self, reason: str) -> Overloaded:
+        self.rejected[reason] += 1
+        return Overloaded(reason, self._retry_after())
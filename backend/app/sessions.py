@@ -0,0 +1,157 @@
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from .index import tokenize
+from .storage import Storage
+
+# Characters per token for a rough, tokenizer-free estimate (Mistral ≈ 3.5–4)
+CHARS_PER_TOKEN = 4
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Index terms remembered per session (for the retrieval router)
+_MAX_TERMS = 2000
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _first_sentences(text: str, max_chars: int) -> str:
+    """Leading sentences of *text* that fit in *max_chars* (at least one, clipped)."""
+    out = ""
+    for sentence in _SENTENCE_RE.split(text.strip()):
+        candidate = f"{out} {sentence}".strip()
+        if len(candidate) > max_chars:
+            break
+        out = candidate
+    return out or text[:max_chars].rstrip() + "…"
+
+
+# ---------------------------------------------------------------------------
+# Session state
+# ---------------------------------------------------------------------------
+
+_NAMESPACE = "session"
+
+
+@dataclass
+class Session:
+    """One conversation: a rolling summary of old turns plus the recent ones."""
+
+    summary: str = ""
+    turns: list[dict[str, str]] = field(default_factory=list)
+    tokens: int = 0  # estimated tokens in ``turns``
+    # Index terms seen in this conversation (questions, replies and retrieved
+    # data), most recent first; outlives compaction of the turns themselves
+    terms: list[str] = field(default_factory=list)
+
+    def messages(self) -> list[dict[str, str]]:
+        """History in the shape the Interface agent expects."""
+        if not self.summary:
+            return list(self.turns)
+        return [
+            {
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{self.summary}",
+            },
+            *self.turns,
+        ]
+
+
+class SessionStore:
+    """Bounded chat-history store on top of a :class:`~app.storage.Storage`.
+
+    - At most *max_sessions* sessions are kept; the least recently used one is
+      evicted first, and sessions idle for *idle_ttl_seconds* are dropped.
+    - Each session's recent turns are kept under *token_budget* estimated
+      tokens. Older turns are folded into an extractive rolling summary,
+      itself capped at *summary_token_budget*, so the prompt sent to the
+      Interface agent stays bounded however long the conversation runs.
+
+    Sessions are serialised to JSON, so with a shared storage backend any
+    worker process can serve any session.
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        max_sessions: int,
+        idle_ttl_seconds: float,
+        token_budget: int,
+        summary_token_budget: int,
+    ) -> None:
+        self.storage = storage
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.token_budget = token_budget
+        self.summary_token_budget = summary_token_budget
+        self.compactions = 0
+        storage.set_capacity(_NAMESPACE, max_sessions)
+
+    def get(self, session_id: str) -> list[dict[str, str]]:
+        """Return the history messages for *session_id* (empty if unknown)."""
+        return self.get_session(session_id).messages()
+
+    def get_session(self, session_id: str) -> Session:
+        """Return the session for *session_id* (a new, empty one if unknown)."""
+        return self._load(session_id) or Session()
+
+    def append(
+        self, session_id: str, user_message: str, reply: str, context: str = ""
+    ) -> None:
+        """Record a completed turn, compacting old turns if over budget.
+
+        *context* is the data retrieved for the turn, if any; only its index
+        terms are kept.
+        """
+        session = self._load(session_id) or Session()
+        session.turns.append({"role": "user", "content": user_message})
+        session.turns.append({"role": "assistant", "content": reply})
+        session.tokens += estimate_tokens(user_message) + estimate_tokens(reply)
+        new_terms = dict.fromkeys(tokenize(f"{user_message}\n{reply}\n{context}"))
+        session.terms = [
+            *new_terms,
+            *(t for t in session.terms if t not in new_terms),
+        ][:_MAX_TERMS]
+        self._compact(session)
+        self.storage.put(
+            _NAMESPACE,
+            session_id,
+            json.dumps(asdict(session)),
+            ttl_seconds=self.idle_ttl_seconds,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return {"compactions": self.compactions}
+
+    def _load(self, session_id: str) -> Session | None:
+        raw = self.storage.get(_NAMESPACE, session_id)
+        return Session(**json.loads(raw)) if raw else None
+
+    def _compact(self, session: Session) -> None:
+        # Keep at least the latest exchange verbatim
+        if session.tokens <= self.token_budget or len(session.turns) <= 2:
+            return
+
+        lines = [session.summary] if session.summary else []
+        while session.tokens > self.token_budget and len(session.turns) > 2:
+            user, reply = session.turns.pop(0), session.turns.pop(0)
+            session.tokens -= estimate_tokens(user["content"])
+            session.tokens -= estimate_tokens(reply["content"])
+            lines.append(
+                f"- User: {_first_sentences(user['content'], 200)}\n"
+                f"  Assistant: {_first_sentences(reply['content'], 400)}"
+            )
+
+        # Drop the oldest summary lines once the summary itself is over budget
+        summary = "\n".join(lines)
+        max_chars = self.summary_token_budget * CHARS_PER_TOKEN
+        if len(summary) > max_chars:
+            summary = summary[-max_chars:]
+            summary = (
+                summary[summary.find("\n- ") + 1 :] if "\n- " in summary else summary
+            )
+        session.summary = summary
+        self.compactions += 1
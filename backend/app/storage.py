@@ -0,0 +1,345 @@
+"""Pluggable key/value storage for session history and pipeline caches.
+
+- :class:`MemoryStorage` — per-process, the default. Fine for a single
+  uvicorn worker.
+- :class:`SQLiteStorage` — one SQLite file in WAL mode shared by every worker
+  process on the node, so a follow-up turn can land on any worker and still
+  see its session. Writes are queued and committed in batches by a background
+  thread.
+
+Values are strings; namespaces keep sessions and caches apart.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Relative STORAGE_SQLITE_PATHs resolve here, next to the document stores, so
+# every worker opens the same file whatever directory it was started from
+_DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+class Storage(ABC):
+    """Namespaced string key/value store with per-entry TTL and size caps."""
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> str | None: ...
+
+    @abstractmethod
+    def put(
+        self, namespace: str, key: str, value: str, ttl_seconds: float | None = None
+    ) -> None: ...
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str) -> None: ...
+
+    @abstractmethod
+    def set_capacity(self, namespace: str, max_items: int) -> None:
+        """Keep at most *max_items* entries in *namespace*, dropping the oldest."""
+
+    def flush(self) -> None:
+        """Make all pending writes durable (no-op for unbuffered backends)."""
+
+    def close(self) -> None:
+        self.flush()
+
+    def stats(self) -> dict[str, Any]:
+        return {}
+
+
+# ---------------------------------------------------------------------------
+# In-process backend
+# ---------------------------------------------------------------------------
+
+
+class MemoryStorage(Storage):
+    """Dict-backed storage with LRU ordering per namespace."""
+
+    def __init__(self) -> None:
+        self._data: dict[str, OrderedDict[str, tuple[str, float]]] = {}
+        self._capacity: dict[str, int] = {}
+        self.evictions = 0
+
+    def get(self, namespace: str, key: str) -> str | None:
+        entries = self._data.get(namespace)
+        if not entries or key not in entries:
+            return None
+        value, expires_at = entries[key]
+        if expires_at < time.monotonic():
+            del entries[key]
+            return None
+        entries.move_to_end(key)
+        return value
+
+    def put(
+        self, namespace: str, key: str, value: str, ttl_seconds: float | None = None
+    ) -> None:
+        entries = self._data.setdefault(namespace, OrderedDict())
+        expires_at = time.monotonic() + ttl_seconds if ttl_seconds else float("inf")
+        entries[key] = (value, expires_at)
+        entries.move_to_end(key)
+        self._evict(namespace, entries)
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._data.get(namespace, {}).pop(key, None)
+
+    def set_capacity(self, namespace: str, max_items: int) -> None:
+        self._capacity[namespace] = max_items
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "backend": "memory",
+            "entries": {ns: len(entries) for ns, entries in self._data.items()},
+            "evictions": self.evictions,
+        }
+
+    def _evict(
+        self, namespace: str, entries: OrderedDict[str, tuple[str, float]]
+    ) -> None:
+        now = time.monotonic()
+        capacity = self._capacity.get(namespace)
+        while entries:
+            key, (_, expires_at) = next(iter(entries.items()))
+            if expires_at >= now and (capacity is None or len(entries) <= capacity):
+                break
+            del entries[key]
+            self.evictions += 1
+
+
+# ---------------------------------------------------------------------------
+# SQLite backend (shared across worker processes)
+# ---------------------------------------------------------------------------
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    namespace  TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    value      TEXT,
+    expires_at REAL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS kv_updated ON kv (namespace, updated_at);
+"""
+
+# Tombstone for a queued delete
+_DELETED = object()
+
+
+class SQLiteStorage(Storage):
+    """SQLite (WAL) storage shared by every worker process on a node.
+
+    ``put``/``delete`` only enqueue; a writer thread commits the queue in one
+    transaction every *flush_interval* seconds (or as soon as *batch_size*
+    writes are pending). Reads consult the queue first, so a worker always
+    sees its own writes; other workers see them after the next flush.
+    Expired rows and rows over a namespace's capacity are pruned by the
+    writer every *prune_interval* seconds.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        flush_interval: float = 0.05,
+        batch_size: int = 256,
+        prune_interval: float = 60.0,
+    ) -> None:
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.prune_interval = prune_interval
+        self.batches = 0
+        self.writes = 0
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+        self._local = threading.local()
+        self._pending: dict[tuple[str, str], tuple[Any, float | None]] = {}
+        self._inflight: dict[tuple[str, str], tuple[Any, float | None]] = {}
+        self._capacity: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._writer: threading.Thread | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # -- Storage API ---------------------------------------------------------
+
+    def get(self, namespace: str, key: str) -> str | None:
+        with self._lock:
+            pending = self._pending.get((namespace, key)) or self._inflight.get(
+                (namespace, key)
+            )
+        if pending is not None:
+            value, expires_at = pending
+            if value is _DELETED or (expires_at and expires_at < time.time()):
+                return None
+            return value
+
+        row = (
+            self._reader()
+            .execute(
+                "SELECT value FROM kv WHERE namespace = ? AND key = ? "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, key, time.time()),
+            )
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def put(
+        self, namespace: str, key: str, value: str, ttl_seconds: float | None = None
+    ) -> None:
+        expires_at = time.time() + ttl_seconds if ttl_seconds else None
+        self._enqueue((namespace, key), (value, expires_at))
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._enqueue((namespace, key), (_DELETED, None))
+
+    def set_capacity(self, namespace: str, max_items: int) -> None:
+        self._capacity[namespace] = max_items
+
+    def flush(self) -> None:
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            self._inflight = batch
+        if not batch:
+            return
+
+        now = time.time()
+        upserts = [
+            (ns, key, value, expires_at, now)
+            for (ns, key), (value, expires_at) in batch.items()
+            if value is not _DELETED
+        ]
+        deletes = [k for k, (value, _) in batch.items() if value is _DELETED]
+
+        conn = self._reader()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(
+                    "INSERT INTO kv (namespace, key, value, expires_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?) ON CONFLICT (namespace, key) DO UPDATE SET "
+                    "value = excluded.value, expires_at = excluded.expires_at, "
+                    "updated_at = excluded.updated_at",
+                    upserts,
+                )
+                conn.executemany(
+                    "DELETE FROM kv WHERE namespace = ? AND key = ?", deletes
+                )
+        except sqlite3.Error:
+            # Re-queue the batch; writes enqueued since take precedence
+            with self._lock:
+                self._pending = {**batch, **self._pending}
+            raise
+        finally:
+            with self._lock:
+                self._inflight = {}
+        self.batches += 1
+        self.writes += len(batch)
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+        if self._writer is not None:
+            self._writer.join()
+        self.flush()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "backend": "sqlite",
+            "path": str(self.path),
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "writes": self.writes,
+        }
+
+    # -- Writer thread -------------------------------------------------------
+
+    def _enqueue(self, k: tuple[str, str], entry: tuple[Any, float | None]) -> None:
+        with self._lock:
+            self._pending[k] = entry
+            full = len(self._pending) >= self.batch_size
+        if self._writer is None:
+            self._start_writer()
+        if full:
+            self._wake.set()
+
+    def _start_writer(self) -> None:
+        with self._lock:
+            if self._writer is not None:
+                return
+            self._writer = threading.Thread(
+                target=self._write_loop, name="sqlite-storage", daemon=True
+            )
+        self._writer.start()
+
+    def _write_loop(self) -> None:
+        last_prune = 0.0
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                if time.monotonic() - last_prune >= self.prune_interval:
+                    self._prune()
+                    last_prune = time.monotonic()
+            except sqlite3.Error:
+                logger.exception("SQLite storage flush failed")
+
+    def _prune(self) -> None:
+        conn = self._reader()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM kv WHERE expires_at <= ?", (time.time(),))
+            for namespace, max_items in self._capacity.items():
+                conn.execute(
+                    "DELETE FROM kv WHERE namespace = ? AND key IN ("
+                    "  SELECT key FROM kv WHERE namespace = ?"
+                    "  ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                    (namespace, namespace, max_items),
+                )
+
+
+# ---------------------------------------------------------------------------
+# Factory
+# ---------------------------------------------------------------------------
+
+
+def create_storage() -> Storage:
+    """Build the backend selected by ``settings.STORAGE_BACKEND``."""
+    if settings.STORAGE_BACKEND == "sqlite":
+        path = _DATA_DIR / settings.STORAGE_SQLITE_PATH
+        logger.info("Using SQLite storage at %s", path)
+        return SQLiteStorage(
+            path,
+            flush_interval=settings.STORAGE_FLUSH_INTERVAL_MS / 1000,
+        )
+    return MemoryStorage()
@@ -0,0 +1,253 @@
+"""Offset-indexed, memory-mapped document store for large Notion/Slack exports.
+
+Exports are streamed record by record into two files per source:
+
+- ``records.jsonl`` — one compact JSON document per line.
+- ``offsets.u64``   — ``n + 1`` little-endian uint64 byte offsets into
+  ``records.jsonl``; record ``i`` spans ``offsets[i]:offsets[i + 1]``.
+
+Both files are memory-mapped, so fetching a document by position touches only
+the pages holding that record and the process RSS does not grow with the size
+of the corpus.
+
+Usage (ingest an export ahead of time)::
+
+    python -m app.store slack_export.json messages data/.store/slack
+"""
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 1 << 20  # bytes read per I/O call while streaming an export
+# An element that does not parse once this much is buffered past its start
+# is malformed, not split across chunks
+_MAX_ELEMENT_SIZE = 16 << 20
+_RECORDS_FILE = "records.jsonl"
+_OFFSETS_FILE = "offsets.u64"
+_META_FILE = "meta.json"
+
+
+# ---------------------------------------------------------------------------
+# Streaming readers
+# ---------------------------------------------------------------------------
+
+
+def _iter_json_array(path: Path, collection: str | None) -> Iterator[dict[str, Any]]:
+    """Yield the elements of a JSON array without loading the whole file.
+
+    If *collection* is given the array is looked up under that top-level key
+    (``{"messages": [...]}``); otherwise the document itself must be an array.
+    A malformed element raises ValueError with its byte offset, after reading
+    at most ``_MAX_ELEMENT_SIZE`` past it.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        base = 0  # byte offset of buf[0] in the file
+        eof = False
+
+        def fill() -> bool:
+            """Drop the consumed prefix and append the next chunk."""
+            nonlocal buf, pos, base, eof
+            chunk = f.read(_CHUNK_SIZE)
+            if not chunk:
+                eof = True
+                return False
+            base += len(buf[:pos].encode("utf-8"))
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        # Seek to the opening bracket of the target array
+        marker = f'"{collection}"' if collection else None
+        while True:
+            if marker is None:
+                start = buf.find("[")
+            else:
+                key = buf.find(marker)
+                start = buf.find("[", key + len(marker)) if key != -1 else -1
+            if start != -1:
+                pos = start + 1
+                break
+            if not fill():
+                raise ValueError(f"{path}: no '{collection or '['}' array found")
+
+        while True:
+            # Skip separators between elements
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n,":
+                    pos += 1
+                if pos < len(buf) or not fill():
+                    break
+            if pos >= len(buf):
+                raise ValueError(f"{path}: unexpected end of file inside array")
+            if buf[pos] == "]":
+                return
+
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as exc:
+                # Most likely the element straddles a chunk boundary
+                if len(buf) - pos <= _MAX_ELEMENT_SIZE and not eof and fill():
+                    continue
+                offset = base + len(buf[:pos].encode("utf-8"))
+                raise ValueError(
+                    f"{path}: malformed element at byte {offset}: {exc.msg}"
+                ) from exc
+            pos = end
+            yield record
+
+
+def _iter_jsonl(path: Path) -> Iterator[dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_records(path: Path, collection: str | None = None) -> Iterator[dict[str, Any]]:
+    """Stream records from a ``.jsonl`` export or a JSON array export."""
+    if path.suffix == ".jsonl":
+        return _iter_jsonl(path)
+    return _iter_json_array(path, collection)
+
+
+# ---------------------------------------------------------------------------
+# Document store
+# ---------------------------------------------------------------------------
+
+
+class DocumentStore:
+    """Read-only, memory-mapped view over an ingested store directory."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self._data: mmap.mmap | None = None
+        self._offsets_map: mmap.mmap | None = None
+        self._offsets: memoryview | None = None
+
+        size = (directory / _OFFSETS_FILE).stat().st_size
+        if size > 8:  # more than the single leading offset → non-empty store
+            with open(directory / _RECORDS_FILE, "rb") as f:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            with open(directory / _OFFSETS_FILE, "rb") as f:
+                self._offsets_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._offsets = memoryview(self._offsets_map).cast("Q")
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1 if self._offsets is not None else 0
+
+    def __getitem__(self, i: int) -> dict[str, Any]:
+        return json.loads(self.raw(i))
+
+    def raw(self, i: int) -> bytes:
+        """The compact JSON encoding of record *i* (without the newline)."""
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        assert self._data is not None and self._offsets is not None
+        return self._data[self._offsets[i] : self._offsets[i + 1] - 1]
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+def build_store(directory: Path, records: Iterable[dict[str, Any]]) -> int:
+    """Write *records* into *directory* and return the number written.
+
+    Files are written under temporary names and swapped in atomically, so
+    readers holding a map of the previous version are never disturbed.
+    """
+    if sys.byteorder != "little":
+        raise RuntimeError("DocumentStore offsets are stored little-endian")
+
+    directory.mkdir(parents=True, exist_ok=True)
+    records_tmp = directory / f"{_RECORDS_FILE}.{os.getpid()}.tmp"
+    offsets_tmp = directory / f"{_OFFSETS_FILE}.{os.getpid()}.tmp"
+
+    count = 0
+    offset = 0
+    offsets = array("Q", [0])
+    with open(records_tmp, "wb") as rf, open(offsets_tmp, "wb") as of:
+        for record in records:
+            line = json.dumps(
+                record, ensure_ascii=False, separators=(",", ":")
+            ).encode()
+            rf.write(line + b"\n")
+            offset += len(line) + 1
+            offsets.append(offset)
+            count += 1
+            if len(offsets) >= 65536:
+                offsets.tofile(of)
+                offsets = array("Q")
+        offsets.tofile(of)
+
+    os.replace(records_tmp, directory / _RECORDS_FILE)
+    os.replace(offsets_tmp, directory / _OFFSETS_FILE)
+    return count
+
+
+def open_store(
+    source: Path, directory: Path, collection: str | None = None
+) -> DocumentStore:
+    """Open the store for *source*, re-ingesting it first if it is stale.
+
+    Staleness is decided from the source file's size and mtime recorded in
+    ``meta.json`` at ingest time.
+    """
+    stat = source.stat()
+    fingerprint = {
+        "source": str(source),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+    meta_path = directory / _META_FILE
+
+    try:
+        meta = json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        meta = {}
+
+    if {k: meta.get(k) for k in fingerprint} != fingerprint:
+        count = build_store(directory, iter_records(source, collection))
+        meta_path.write_text(json.dumps({**fingerprint, "count": count}))
+        logger.info(
+            "Ingested %d records from %s into %s", count, source.name, directory
+        )
+
+    return DocumentStore(directory)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Ingest a Notion/Slack export into a store."
+    )
+    parser.add_argument("source", type=Path, help="JSON or JSONL export file")
+    parser.add_argument(
+        "collection", help="top-level array key, e.g. 'messages' or 'docs'"
+    )
+    parser.add_argument("directory", type=Path, help="output store directory")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    store = open_store(args.source, args.directory, args.collection)
+    print(f"{len(store)} records in {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import asyncio
+import contextlib
+from types import TracebackType
+
+from .coalesce import Emit
+
+# ---------------------------------------------------------------------------
+# Token frame coalescing
+# ---------------------------------------------------------------------------
+
+
+class TokenCoalescer:
+    """Batch streamed text deltas into fewer SSE frames.
+
+    Deltas are buffered and emitted as one ``{"text": ...}`` frame once
+    *max_bytes* (UTF-8) have accumulated or *window_ms* has passed since the
+    first buffered delta, whichever comes first. A *window_ms* of 0 emits
+    every delta immediately (one frame per token, the original behaviour).
+
+    Use it as an async context manager: the rest is flushed when the block
+    ends, and on an error or cancellation the window timer is cancelled and
+    the rest dropped, so no frame is emitted after the stage is over.
+
+    The payload shape is unchanged, so clients that append ``text`` from each
+    ``token`` frame keep working.
+    """
+
+    def __init__(
+        self,
+        emit: Emit,
+        event_type: str = "token",
+        window_ms: float = 0,
+        max_bytes: int = 0,
+    ) -> None:
+        self._emit = emit
+        self._event_type = event_type
+        self._window = window_ms / 1000
+        self._max_bytes = max_bytes
+        self._parts: list[str] = []
+        self._size = 0
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task[None] | None = None  # pending window flush
+        self._timers: set[asyncio.Task[None]] = set()  # every one still running
+        self.frames = 0
+
+    async def __aenter__(self) -> "TokenCoalescer":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            await self.flush()
+        else:
+            await self.discard()
+
+    async def add(self, text: str) -> None:
+        self._parts.append(text)
+        self._size += len(text.encode())
+        if self._window <= 0 or (self._max_bytes and self._size >= self._max_bytes):
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_after_window())
+            self._timers.add(self._timer)
+            self._timer.add_done_callback(self._timers.discard)
+
+    async def flush(self) -> None:
+        """Emit whatever is buffered (call once more at end of stream)."""
+        timer, self._timer = self._timer, None
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+        async with self._lock:
+            if not self._parts:
+                return
+            text = "".join(self._parts)
+            self._parts, self._size = [], 0
+            self.frames += 1
+            await self._emit(self._event_type, {"text": text})
+
+    async def discard(self) -> None:
+        """Cancel window timers (even one mid-flush) and drop the buffer."""
+        self._timer = None
+        timers = [t for t in self._timers if t is not asyncio.current_task()]
+        for timer in timers:
+            timer.cancel()
+        for timer in timers:
+            with contextlib.suppress(asyncio.CancelledError):
+                await timer
+        self._parts, self._size = [], 0
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self._window)
+        await self.flush()
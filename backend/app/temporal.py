@@ -0,0 +1,113 @@
+"""Time-sorted passage index and recency weighting.
+
+Every passage carries the date of its record (Notion ``last_updated``,
+Slack ``date``) as a day ordinal. :class:`TimeIndex` keeps passage ids
+bucketed per day with the days in sorted order, so a ``since``/``until``
+window is resolved to its passage ids with two bisections — before any
+text scoring — and updates stay cheap as records come and go.
+
+:func:`recency_factor` turns a passage's age, relative to the newest
+candidate, into a multiplier for its relevance score, so that among
+similarly relevant passages the latest decision ranks first.
+"""
+
+import bisect
+import re
+from array import array
+from datetime import date
+from typing import Iterable
+
+# Day ordinal of passages without a (parseable) date
+UNDATED = 0
+
+# Words and forms that limit a question to a period of time
+_DATE_CUE = re.compile(
+    r"\b(?:\d{4}-\d{2}(?:-\d{2})?|(?:19|20)\d{2}|since|until|before|after|ago"
+    r"|today|yesterday|tomorrow|week|weeks|month|months|year|years|quarter"
+    r"|monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+    r"|jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?"
+    r"|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\b",
+    re.IGNORECASE,
+)
+
+
+def parse_day(value: object) -> int:
+    """Day ordinal of an ISO date (or date-time) string; UNDATED if invalid."""
+    if not isinstance(value, str) or len(value) < 10:
+        return UNDATED
+    try:
+        return date.fromisoformat(value[:10]).toordinal()
+    except ValueError:
+        return UNDATED
+
+
+def mentions_dates(text: str) -> bool:
+    """Whether *text* refers to a date or period (so may imply a window)."""
+    return _DATE_CUE.search(text) is not None
+
+
+def recency_factor(age_days: float, weight: float, half_life_days: float) -> float:
+    """Score multiplier: 1 when newest, decaying towards ``1 - weight``."""
+    return 1.0 - weight + weight * 0.5 ** (age_days / half_life_days)
+
+
+class TimeIndex:
+    """Passage ids bucketed by day, days kept sorted."""
+
+    def __init__(self) -> None:
+        self._day = array("i")  # passage id → day ordinal
+        self._buckets: dict[int, set[int]] = {}
+        self._days: list[int] = []  # sorted keys of _buckets
+        self._undated = 0  # indexed passages without a date
+
+    def day(self, passage_id: int) -> int:
+        return self._day[passage_id] if passage_id < len(self._day) else UNDATED
+
+    def add(self, passage_id: int, day: int) -> None:
+        if passage_id >= len(self._day):
+            self._day.extend([UNDATED] * (passage_id + 1 - len(self._day)))
+        self._day[passage_id] = day
+        if day == UNDATED:
+            self._undated += 1
+            return
+        bucket = self._buckets.get(day)
+        if bucket is None:
+            bucket = self._buckets[day] = set()
+            bisect.insort(self._days, day)
+        bucket.add(passage_id)
+
+    def remove(self, passage_id: int) -> None:
+        """Drop *passage_id*, which must have been added."""
+        day = self.day(passage_id)
+        if day == UNDATED:
+            self._undated -= 1
+            return
+        self._day[passage_id] = UNDATED
+        bucket = self._buckets[day]
+        bucket.discard(passage_id)
+        if not bucket:
+            del self._buckets[day]
+            del self._days[bisect.bisect_left(self._days, day)]
+
+    def window(self, since: int | None, until: int | None) -> set[int] | None:
+        """Passage ids dated within ``[since, until]`` (inclusive).
+
+        None when neither bound is set or the window spans every passage
+        (nothing to prune). Undated passages never match a window.
+        """
+        if since is None and until is None:
+            return None
+        lo = 0 if since is None else bisect.bisect_left(self._days, since)
+        hi = (
+            len(self._days) if until is None else bisect.bisect_right(self._days, until)
+        )
+        if lo == 0 and hi == len(self._days) and not self._undated:
+            return None
+        ids: set[int] = set()
+        for day in self._days[lo:hi]:
+            ids |= self._buckets[day]
+        return ids
+
+    def newest(self, passage_ids: Iterable[int]) -> int:
+        """Latest day among *passage_ids* (UNDATED if none is dated)."""
+        return max((self.day(pid) for pid in passage_ids), default=UNDATED)
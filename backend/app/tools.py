@@ -1,104 +1,397 @@
-import json
+import heapq
+import logging
+import threading
+from array import array
 from pathlib import Path
-from typing import Callable
+from typing import Any, Callable, Iterable, Iterator
+
+from . import dense
+from .config import settings
+from .connectors import Connector
+from .corpus import CorpusManager
+from .index import tokenize
+from .passages import PassageIndex, clean
+from .store import DocumentStore, open_store
+from .temporal import parse_day
+
+logger = logging.getLogger(__name__)
 
 DATA_DIR = Path(__file__).parent.parent / "data"
+STORE_DIR = DATA_DIR / ".store"
 
 
-def read_notion_mock(query: str) -> str:
-    """Search mock Notion docs for content matching the query keywords."""
-    with open(DATA_DIR / "mock_notion.json", encoding="utf-8") as f:
-        data = json.load(f)
+# ---------------------------------------------------------------------------
+# Indexed sources — ingested and indexed once, then updated incrementally
+# ---------------------------------------------------------------------------
 
-    keywords = query.lower().split()
-    for doc in data["docs"]:
-        haystack = (doc["title"] + " " + doc["content"]).lower()
-        if any(kw in haystack for kw in keywords):
-            return (
-                f"[Notion | {doc['title']} | Last updated: {doc['last_updated']}] "
-                f"{doc['content']}"
-            )
+# Records (un)indexed per lock hold while applying a change, so queries are
+# only ever paused for one batch
+_APPLY_BATCH = 256
+
+if settings.RETRIEVAL_DENSE and not dense.AVAILABLE:
+    logger.warning(
+        "RETRIEVAL_DENSE is set but numpy is missing (install the 'dense' "
+        "extra); using BM25 only"
+    )
+_DENSE = settings.RETRIEVAL_DENSE and dense.AVAILABLE
+
+
+class _Source:
+    """A data export ingested into a memory-mapped store plus a passage index.
+
+    :meth:`refresh` (run by the :data:`CORPUS` watcher) re-ingests the export
+    when its size or mtime changed and diffs it against the indexed records
+    by content: only added and removed records are (un)indexed, an edited
+    record being both. Queries never touch the export file. Each record's
+    *text* is chunked into passages (indexed together with its *title*, if
+    any) and dated by *date* (an ISO date). Only the index lives on the
+    heap; records are read from the store on demand.
+
+    With dense retrieval, passage vectors are computed after the initial
+    load and saved next to the store, so later startups over the same
+    export memory-map them instead of recomputing.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        path: Path,
+        collection: str,
+        text: Callable[[dict[str, Any]], str],
+        date: Callable[[dict[str, Any]], str],
+        title: Callable[[dict[str, Any]], str] | None = None,
+    ) -> None:
+        self.name = name
+        self.path = path
+        self.collection = collection
+        self._text = text
+        self._date = date
+        self._title = title
+        self._lock = threading.Lock()  # guards the fields below
+        self._refresh_lock = threading.Lock()
+        self._fingerprint: tuple[int, int] | None = None
+        self._store: DocumentStore | None = None
+        self._index = PassageIndex(
+            settings.PASSAGE_MAX_TOKENS,
+            dense.DenseIndex(settings.DENSE_DIM) if _DENSE else None,
+            settings.DENSE_MIN_SCORE,
+            settings.RECENCY_WEIGHT,
+            settings.RECENCY_HALF_LIFE_DAYS,
+        )
+        # Stable doc ids: record content hash → doc id → store position
+        # (-1 once removed). Identical records share one doc id.
+        self._ids: dict[int, int] = {}
+        self._positions = array("q")
+
+    def refresh(self) -> set[str] | None:
+        """Apply changes to the export since the last call.
+
+        Returns the index terms of every added or removed record (empty on
+        the initial load), or None if the export is unchanged.
+        """
+        with self._refresh_lock:
+            stat = self.path.stat()
+            fingerprint = (stat.st_size, stat.st_mtime_ns)
+            if fingerprint == self._fingerprint:
+                return None
 
-    return f"No relevant Notion document found for query: {query}"
+            store = open_store(self.path, STORE_DIR / self.name, self.collection)
+            new_ids: dict[int, int] = {}  # content hash → position in *store*
+            for position in range(len(store)):
+                new_ids.setdefault(hash(store.raw(position)), position)
 
+            old_store, old_positions = self._store, self._positions
+            positions = array("q", old_positions)
+            ids: dict[int, int] = {}
+            removed = []
+            for key, doc_id in self._ids.items():
+                position = new_ids.get(key)
+                if position is None:
+                    positions[doc_id] = -1
+                    removed.append(doc_id)
+                else:
+                    positions[doc_id] = position
+                    ids[key] = doc_id
+            added = []
+            for key, position in new_ids.items():
+                if key not in ids:
+                    ids[key] = len(positions)
+                    added.append(len(positions))
+                    positions.append(position)
 
-def read_slack_mock(query: str) -> str:
-    """Search mock Slack messages for content matching the query keywords."""
-    with open(DATA_DIR / "mock_slack.json", encoding="utf-8") as f:
-        data = json.load(f)
+            # Swap in the new store first: removed docs resolve to -1 (and are
+            # skipped by search) until they are unindexed below
+            with self._lock:
+                self._store, self._positions, self._ids = store, positions, ids
 
-    keywords = query.lower().split()
-    for msg in data["messages"]:
-        haystack = msg["text"].lower()
-        if any(kw in haystack for kw in keywords):
-            return (
-                f"[Slack | {msg['channel']} | {msg['user']} | {msg['date']}] "
-                f"{msg['text']}"
+            touched: set[str] | None = None if old_store is None else set()
+            for batch_start in range(0, len(removed), _APPLY_BATCH):
+                with self._lock:
+                    for doc_id in removed[batch_start : batch_start + _APPLY_BATCH]:
+                        assert old_store is not None
+                        record = old_store[old_positions[doc_id]]
+                        self._apply(False, doc_id, record, touched)
+            for batch_start in range(0, len(added), _APPLY_BATCH):
+                with self._lock:
+                    for doc_id in added[batch_start : batch_start + _APPLY_BATCH]:
+                        record = store[positions[doc_id]]
+                        self._apply(True, doc_id, record, touched)
+            if self._index.dense is not None:
+                self._embed(added, store, positions, fingerprint, old_store is None)
+
+            self._fingerprint = fingerprint
+            logger.info(
+                "%s: +%d -%d records (%d passages indexed)",
+                self.path.name,
+                len(added),
+                len(removed),
+                len(self._index),
             )
+            return touched if touched is not None else set()
 
-    return f"No relevant Slack message found for query: {query}"
+    def _apply(
+        self,
+        add: bool,
+        doc_id: int,
+        record: dict[str, Any],
+        touched: set[str] | None,
+    ) -> None:
+        text = self._text(record)
+        title = self._title(record) if self._title else ""
+        if add:
+            self._index.add(doc_id, text, title, parse_day(self._date(record)))
+        else:
+            self._index.remove(doc_id, text, title)
+        if touched is not None:
+            touched.update(tokenize(f"{title} {text}"))
 
+    def _embed(
+        self,
+        doc_ids: list[int],
+        store: DocumentStore,
+        positions: array,
+        fingerprint: tuple[int, int],
+        initial: bool,
+    ) -> None:
+        """Give *doc_ids* dense vectors (from disk, on an initial load)."""
+        assert self._index.dense is not None
+        path = STORE_DIR / self.name / "vectors.npy"
+        key = f"{fingerprint[0]}:{fingerprint[1]}:{settings.PASSAGE_MAX_TOKENS}"
+        if initial and self._index.dense.load(path, key):
+            if len(self._index.dense) == len(self._index):
+                logger.info("Loaded %s passage vectors", self.name)
+                return
+            self._index.dense = dense.DenseIndex(settings.DENSE_DIM)
+        for batch_start in range(0, len(doc_ids), _APPLY_BATCH):
+            with self._lock:
+                for doc_id in doc_ids[batch_start : batch_start + _APPLY_BATCH]:
+                    record = store[positions[doc_id]]
+                    title = self._title(record) if self._title else ""
+                    self._index.embed(doc_id, self._text(record), title)
+        if initial:
+            self._index.dense.save(path, key)
 
-# ---------------------------------------------------------------------------
-# Tool dispatcher
-# ---------------------------------------------------------------------------
+    def _ensure_loaded(self) -> None:
+        """Load on first use when the corpus watcher has not done so yet.
 
-TOOL_REGISTRY: dict[str, Callable[[str], str]] = {
-    "read_notion_mock": read_notion_mock,
-    "read_slack_mock": read_slack_mock,
-}
+        Goes through :data:`CORPUS`, so the load is versioned like any other
+        change and keys derived from the corpus version move on.
+        """
+        if self._store is None:
+            CORPUS.poll()
 
+    def has_term(self, term: str) -> bool:
+        self._ensure_loaded()
+        return term in self._index
 
-def execute_tool(name: str, query: str) -> str:
-    fn = TOOL_REGISTRY.get(name)
-    if not fn:
-        return f"Unknown tool: {name}"
-    return fn(query)
+    def records(self) -> Iterator[dict[str, Any]]:
+        self._ensure_loaded()
+        assert self._store is not None
+        return iter(self._store)
+
+    def best_score(self, query: str) -> float:
+        """BM25 score of the best passage for *query* (0 if nothing matches)."""
+        self._ensure_loaded()
+        with self._lock:
+            hits = self._index.search(query, 1, dense=False, recency=False)
+        return hits[0].score if hits else 0.0
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        since: str | None = None,
+        until: str | None = None,
+    ) -> list[tuple[dict[str, Any], str]]:
+        """Return the *k* best ``(record, passage text)`` pairs, best first.
+
+        *since*/*until* (ISO dates, inclusive) restrict the records' dates;
+        an unparseable bound is ignored.
+        """
+        self._ensure_loaded()
+        window = [parse_day(bound) or None for bound in (since, until)]
+        hits = []
+        with self._lock:
+            store, positions = self._store, self._positions
+            assert store is not None
+            for passage in self._index.search(query, k, True, *window):
+                position = positions[passage.doc_id]
+                if position < 0:
+                    continue
+                record = store[position]
+                text = self._text(record)[passage.start : passage.end]
+                hits.append((record, clean(text)))
+        return hits
+
+
+_NOTION = _Source(
+    "notion",
+    Path(settings.NOTION_DATA_PATH or DATA_DIR / "mock_notion.json"),
+    "docs",
+    text=lambda d: d["content"],
+    date=lambda d: d.get("last_updated", ""),
+    title=lambda d: d["title"],
+)
+_SLACK = _Source(
+    "slack",
+    Path(settings.SLACK_DATA_PATH or DATA_DIR / "mock_slack.json"),
+    "messages",
+    text=lambda m: m["text"],
+    date=lambda m: m.get("date", ""),
+)
+
+# Watched by a background task (see app.main); versions the indexed data
+CORPUS = CorpusManager([_NOTION, _SLACK])
+
+
+def load_sources() -> None:
+    """Ingest and index every source up front so the first query pays nothing."""
+    CORPUS.poll()
+
+
+def corpus_version() -> int:
+    """Bumped whenever a source change has been applied to the index."""
+    return CORPUS.version
+
+
+def _in_corpus(term: str) -> bool:
+    return any(s.has_term(term) for s in (_NOTION, _SLACK))
+
+
+def corpus_terms(terms: Iterable[str], text: str = "") -> set[str]:
+    """The subset of index *terms* that occur in at least one source.
+
+    With dense retrieval, terms of *text* (the message they come from) that
+    a paraphrase maps onto a corpus term ("sign in" → "login") count too:
+    the dense index matches them.
+    """
+    terms = set(terms)
+    found = {t for t in terms if _in_corpus(t)}
+    if _DENSE and text and found != terms:
+        lexical, mapped = set(tokenize(text)), set(dense.terms(text))
+        if any(_in_corpus(t) for t in mapped - lexical):
+            found |= (terms - found) & (lexical - mapped)
+    return found
+
+
+def cross_source_topics(limit: int) -> list[str]:
+    """Notion page titles that Slack also discusses, strongest match first.
+
+    Each is a topic where a newer Slack decision may override the spec — a
+    candidate for a precomputed Source of Truth.
+    """
+    scores: dict[str, float] = {}
+    for doc in _NOTION.records():
+        score = _SLACK.best_score(doc["title"])
+        if score > scores.get(doc["title"], 0.0):
+            scores[doc["title"]] = score
+    return heapq.nlargest(limit, scores, key=scores.__getitem__)
+
+
+def read_notion_mock(
+    query: str, since: str | None = None, until: str | None = None
+) -> str:
+    """Search mock Notion docs for passages matching the query keywords."""
+    hits = _NOTION.search(query, settings.RETRIEVAL_TOP_K, since, until)
+    if not hits:
+        return f"No relevant Notion document found for query: {query}"
+
+    return "\n".join(
+        f"[Notion | {doc['title']} | Last updated: {doc['last_updated']}] {passage}"
+        for doc, passage in hits
+    )
+
+
+def read_slack_mock(
+    query: str, since: str | None = None, until: str | None = None
+) -> str:
+    """Search mock Slack messages for passages matching the query keywords."""
+    hits = _SLACK.search(query, settings.RETRIEVAL_TOP_K, since, until)
+    if not hits:
+        return f"No relevant Slack message found for query: {query}"
+
+    return "\n".join(
+        f"[Slack | {msg['channel']} | {msg['user']} | {msg['date']}] {passage}"
+        for msg, passage in hits
+    )
 
 
 # ---------------------------------------------------------------------------
-# JSON tool schemas — passed to Mistral on agent creation
+# Connectors — each generates its tool schema (passed to Mistral on agent
+# creation); add a source by adding a connector
 # ---------------------------------------------------------------------------
 
-TOOL_SCHEMAS: list[dict] = [
-    {
-        "type": "function",
-        "function": {
-            "name": "read_notion_mock",
-            "description": (
-                "Search the Notion documentation for pages matching the given query. "
-                "Returns the most relevant document content or a not-found message."
-            ),
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "Keywords to search for in Notion docs.",
-                    }
-                },
-                "required": ["query"],
-            },
-        },
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "read_slack_mock",
-            "description": (
-                "Search the Slack message history for messages matching the given query. "
-                "Returns the most relevant message or a not-found message."
-            ),
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "Keywords to search for in Slack messages.",
-                    }
-                },
-                "required": ["query"],
-            },
-        },
-    },
+CONNECTORS: list[Connector] = [
+    Connector(
+        name="read_notion_mock",
+        label="Notion",
+        description=(
+            "Search the Notion documentation for pages matching the given query. "
+            "Returns the most relevant passages, one per line with the page title "
+            "and date, best match first (more recent pages rank higher), or a "
+            "not-found message."
+        ),
+        query_description="Keywords to search for in Notion docs.",
+        search=read_notion_mock,
+        timeout_seconds=settings.TOOL_TIMEOUT_SECONDS,
+        max_workers=settings.TOOL_MAX_WORKERS,
+    ),
+    Connector(
+        name="read_slack_mock",
+        label="Slack",
+        description=(
+            "Search the Slack message history for messages matching the given query. "
+            "Returns the most relevant messages, one per line with channel, author "
+            "and date, best match first (more recent messages rank higher), or a "
+            "not-found message."
+        ),
+        query_description="Keywords to search for in Slack messages.",
+        search=read_slack_mock,
+        timeout_seconds=settings.TOOL_TIMEOUT_SECONDS,
+        max_workers=settings.TOOL_MAX_WORKERS,
+    ),
 ]
+
+TOOL_REGISTRY: dict[str, Connector] = {c.name: c for c in CONNECTORS}
+
+TOOL_SCHEMAS: list[dict] = [c.schema() for c in CONNECTORS]
+
+
+def execute_tool(
+    name: str, query: str, since: str | None = None, until: str | None = None
+) -> str:
+    """Run tool *name* in the calling thread, without a deadline."""
+    connector = TOOL_REGISTRY.get(name)
+    if not connector:
+        return f"Unknown tool: {name}"
+    return connector.search(query, since, until)
+
+
+async def run_tool(
+    name: str, query: str, since: str | None = None, until: str | None = None
+) -> str:
+    """Run tool *name* on its connector's workers, within its deadline."""
+    connector = TOOL_REGISTRY.get(name)
+    if not connector:
+        return f"Unknown tool: {name}"
+    return await connector.run(query, since, until)
@@ -0,0 +1,241 @@
+"""Upstream (Mistral) calls: pooled connections, deadlines, retries, hedging.
+
+- :func:`create_client` sizes the keep-alive connection pool and the
+  connect/read timeouts of the shared HTTP client.
+- :func:`deadline` bounds a pipeline stage. Stages nest (a stage inside the
+  turn), and every upstream call made inside has its read timeout capped at
+  the time left.
+- :func:`stream` and :func:`complete` retry transient failures
+  (connection errors, timeouts, 429 and 5xx) with full-jitter exponential
+  backoff while the deadline allows. A stream is only retried until it is
+  established, so no content is ever duplicated.
+- :func:`complete` can hedge: when the first request has not answered
+  within the p95 of recent latencies, an identical second one is sent and
+  the first answer wins.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, TypeVar
+
+import httpx
+from mistralai import Mistral, models
+
+from .config import settings
+from .metrics import DEADLINES_EXCEEDED, UPSTREAM_HEDGES, UPSTREAM_RETRIES
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying
+_RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Recent latencies kept per agent for the hedging delay, and how many are
+# needed before their p95 is trusted over the configured minimum
+_LATENCY_WINDOW = 200
+_HEDGE_MIN_SAMPLES = 20
+
+# Event-loop time by which the current stage must finish
+_DEADLINE: ContextVar[float | None] = ContextVar("upstream_deadline", default=None)
+
+_latencies: dict[str, deque[float]] = defaultdict(lambda: deque(maxlen=_LATENCY_WINDOW))
+
+
+class DeadlineExceeded(TimeoutError):
+    """A pipeline stage did not finish within its deadline."""
+
+    def __init__(self, stage: str, seconds: float) -> None:
+        super().__init__(f"{stage} did not finish within {seconds:g}s")
+        self.stage = stage
+
+
+def create_client() -> Mistral:
+    """The Mistral client, on a sized keep-alive connection pool."""
+    http = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.UPSTREAM_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=_request_timeout(None),
+        event_hooks={"request": [_apply_timeout]},
+    )
+    return Mistral(
+        api_key=settings.MISTRAL_API_KEY,
+        server_url=settings.MISTRAL_SERVER_URL or None,
+        async_client=http,
+    )
+
+
+def _request_timeout(remaining: float | None) -> httpx.Timeout:
+    """Configured timeouts, the read timeout capped at *remaining* seconds."""
+    read = settings.UPSTREAM_READ_TIMEOUT_SECONDS
+    if remaining is not None:
+        read = max(0.001, min(read, remaining))
+    return httpx.Timeout(
+        read, connect=min(settings.UPSTREAM_CONNECT_TIMEOUT_SECONDS, read)
+    )
+
+
+async def _apply_timeout(request: httpx.Request) -> None:
+    # The SDK sends every request with an explicit timeout (None, i.e. no
+    # timeout at all, unless timeout_ms is given) that overrides the client's,
+    # so the timeouts are set here, per request, from the current deadline
+    request.extensions["timeout"] = _request_timeout(_remaining()).as_dict()
+
+
+# ---------------------------------------------------------------------------
+# Deadlines
+# ---------------------------------------------------------------------------
+
+
+@asynccontextmanager
+async def deadline(stage: str, seconds: float) -> AsyncIterator[None]:
+    """Run the block within *seconds*, else raise :class:`DeadlineExceeded`.
+
+    Upstream calls inside time out when the nearest enclosing deadline
+    passes, and are not retried past it.
+    """
+    loop = asyncio.get_running_loop()
+    at = loop.time() + seconds
+    outer = _DEADLINE.get()
+    token = _DEADLINE.set(at if outer is None else min(at, outer))
+    timeout = asyncio.timeout_at(at)
+    try:
+        async with timeout:
+            yield
+    except TimeoutError:
+        if not timeout.expired():
+            raise
+        DEADLINES_EXCEEDED.inc(stage=stage)
+        raise DeadlineExceeded(stage, seconds) from None
+    finally:
+        _DEADLINE.reset(token)
+
+
+def _remaining() -> float | None:
+    """Seconds left before the current deadline (None without one)."""
+    at = _DEADLINE.get()
+    return None if at is None else at - asyncio.get_running_loop().time()
+
+
+# ---------------------------------------------------------------------------
+# Retries
+# ---------------------------------------------------------------------------
+
+
+def _transient(exc: Exception) -> str | None:
+    """Retry reason for *exc*, or None if retrying would not help."""
+    if isinstance(exc, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(exc, (httpx.TransportError, models.NoResponseError)):
+        return "connection"
+    if isinstance(exc, models.MistralError) and exc.status_code in _RETRY_STATUSES:
+        return f"http_{exc.status_code}"
+    return None
+
+
+def _backoff(attempt: int, exc: Exception) -> float:
+    """Full-jitter exponential backoff, or the server's Retry-After if longer."""
+    delay = random.uniform(0, settings.UPSTREAM_RETRY_BACKOFF_SECONDS * 2**attempt)
+    if isinstance(exc, models.MistralError):
+        try:
+            delay = max(delay, float(exc.headers.get("retry-after", 0)))
+        except ValueError:
+            pass
+    return delay
+
+
+async def _retrying(agent: str, call: Callable[[], Awaitable[T]]) -> T:
+    attempt = 0
+    while True:
+        try:
+            return await call()
+        except Exception as exc:
+            reason = _transient(exc)
+            if reason is None or attempt >= settings.UPSTREAM_MAX_RETRIES:
+                raise
+            delay = _backoff(attempt, exc)
+            remaining = _remaining()
+            if remaining is not None and delay >= remaining:
+                raise
+            attempt += 1
+            UPSTREAM_RETRIES.inc(agent=agent, reason=reason)
+            logger.warning(
+                "%s call failed (%s); retry %d in %.2fs", agent, reason, attempt, delay
+            )
+            await asyncio.sleep(delay)
+
+
+# ---------------------------------------------------------------------------
+# Calls
+# ---------------------------------------------------------------------------
+
+
+@asynccontextmanager
+async def stream(client: Mistral, agent: str, **request: Any) -> AsyncIterator[Any]:
+    """``client.agents.stream_async(**request)``, retried until established."""
+    response = await _retrying(agent, lambda: client.agents.stream_async(**request))
+    async with response as events:
+        yield events
+
+
+async def complete(
+    client: Mistral, agent: str, hedge: bool = False, **request: Any
+) -> models.ChatCompletionResponse:
+    """``client.agents.complete_async(**request)`` with retries.
+
+    With *hedge*, a second request is sent if the first is slower than the
+    hedging delay; whichever answers first is returned.
+    """
+
+    async def attempt() -> models.ChatCompletionResponse:
+        start = time.perf_counter()
+        response = await _retrying(
+            agent, lambda: client.agents.complete_async(**request)
+        )
+        _latencies[agent].append(time.perf_counter() - start)
+        return response
+
+    if not hedge:
+        return await attempt()
+
+    first = asyncio.create_task(attempt())
+    pending: set[asyncio.Task[models.ChatCompletionResponse]] = {first}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=_hedge_delay(agent))
+        if done:
+            return first.result()
+        UPSTREAM_HEDGES.inc(agent=agent, outcome="sent")
+        pending.add(asyncio.create_task(attempt()))
+        failed: BaseException | None = None
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    if task is not first:
+                        UPSTREAM_HEDGES.inc(agent=agent, outcome="won")
+                    return task.result()
+                failed = failed or task.exception()
+        assert failed is not None
+        raise failed
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _hedge_delay(agent: str) -> float:
+    """p95 of *agent*'s recent latencies, at least the configured minimum."""
+    floor = settings.UPSTREAM_HEDGE_MIN_DELAY_SECONDS
+    samples = sorted(_latencies[agent])
+    if len(samples) < _HEDGE_MIN_SAMPLES:
+        return floor
+    return max(floor, samples[int(0.95 * (len(samples) - 1))])
@@ -0,0 +1,125 @@
+"""Synthetic Notion/Slack corpora shaped like ``data/mock_*.json``.
+
+Text is drawn from a fixed vocabulary with a Zipf-like frequency
+distribution (a few very common terms, a long tail of rare ones), seeded so
+that the same ``(source, records, seed)`` always produces the same file.
+"""
+
+import itertools
+import json
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+# Domain terms (the head of the distribution) followed by synthetic filler
+_DOMAIN_WORDS = """
+    login auth oauth google password email spec mvp release deploy api backend
+    frontend database migration schema token session cache latency outage
+    incident review design roadmap sprint bug fix feature flag rollout billing
+    invoice payment stripe webhook queue worker retry timeout error metrics
+    dashboard alert oncall security audit compliance gdpr onboarding signup
+    """.split()
+_VOCAB_SIZE = 50_000
+_SYLLABLES = ("ka", "lo", "mi", "ne", "ru", "ta", "vo", "zi", "pe", "su", "da", "fo")
+
+_CHANNELS = ("#engineering", "#product", "#general", "#incidents", "#design")
+_USERS = ("CEO", "CTO", "PM", "Alice", "Bob", "Carol", "Dave", "Eve")
+_EPOCH = date(2024, 1, 1)
+
+# Which top-level key holds the records, and the text each tool searches
+SOURCES: dict[str, tuple[str, Callable[[dict[str, Any]], str]]] = {
+    "notion": ("docs", lambda d: d["title"] + " " + d["content"]),
+    "slack": ("messages", lambda m: m["text"]),
+}
+
+
+def _vocabulary() -> list[str]:
+    words = list(_DOMAIN_WORDS)
+    for n in itertools.count(2):
+        for parts in itertools.product(_SYLLABLES, repeat=n):
+            words.append("".join(parts))
+            if len(words) == _VOCAB_SIZE:
+                return words
+    raise AssertionError("unreachable")
+
+
+VOCABULARY = _vocabulary()
+# Zipf (s = 1) cumulative weights for random.choices
+_CUM_WEIGHTS = list(
+    itertools.accumulate(1 / rank for rank in range(1, _VOCAB_SIZE + 1))
+)
+
+
+class _Words:
+    def __init__(self, rng: random.Random) -> None:
+        self._rng = rng
+
+    def __call__(self, n: int) -> str:
+        return " ".join(self._rng.choices(VOCABULARY, cum_weights=_CUM_WEIGHTS, k=n))
+
+    def date(self) -> str:
+        return (_EPOCH + timedelta(days=self._rng.randrange(3 * 365))).isoformat()
+
+
+def _notion_records(n: int, rng: random.Random) -> Iterator[dict[str, Any]]:
+    words = _Words(rng)
+    for i in range(n):
+        yield {
+            "id": f"doc_{i + 1}",
+            "title": words(rng.randint(3, 8)).title(),
+            "last_updated": words.date(),
+            "content": words(rng.randint(20, 80)) + ".",
+        }
+
+
+def _slack_records(n: int, rng: random.Random) -> Iterator[dict[str, Any]]:
+    words = _Words(rng)
+    for _ in range(n):
+        yield {
+            "channel": rng.choice(_CHANNELS),
+            "user": rng.choice(_USERS),
+            "date": words.date(),
+            "text": words(rng.randint(8, 40)) + ".",
+        }
+
+
+_GENERATORS = {"notion": _notion_records, "slack": _slack_records}
+
+
+def generate(source: str, records: int, directory: Path, seed: int = 0) -> Path:
+    """Write (or reuse) a synthetic export and return its path.
+
+    The file is streamed one record per line inside the usual
+    ``{"<collection>": [...]}`` wrapper, so 10M-record corpora never have to
+    fit in memory.
+    """
+    collection, _ = SOURCES[source]
+    path = directory / f"{source}-{records}-{seed}.json"
+    if path.exists():
+        return path
+
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(f"{source}:{seed}")
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(f'{{"{collection}": [\n')
+        for i, record in enumerate(_GENERATORS[source](records, rng)):
+            f.write(",\n" if i else "")
+            f.write(json.dumps(record))
+        f.write("\n]}\n")
+    tmp.replace(path)
+    return path
+
+
+def queries(n: int, seed: int = 0) -> list[str]:
+    """*n* queries mixing common domain terms with mid- and long-tail words."""
+    rng = random.Random(f"queries:{seed}")
+    out = []
+    for _ in range(n):
+        terms = rng.sample(_DOMAIN_WORDS, rng.randint(1, 3))
+        rank = int(_VOCAB_SIZE ** rng.random())  # log-uniform over ranks
+        terms.append(VOCABULARY[rank - 1])
+        rng.shuffle(terms)
+        out.append(" ".join(terms))
+    return out
@@ -0,0 +1,70 @@
+"""Paraphrase recall check for dense retrieval (needs numpy).
+
+Indexes the bundled Notion export plus a few unrelated pages with hybrid
+(BM25 + dense) retrieval and checks that natural questions which never use
+the page's own words still rank the login spec first. Exits non-zero on a
+miss::
+
+    python -m benchmarks.paraphrases
+"""
+
+import json
+import sys
+from pathlib import Path
+
+from app import dense
+from app.config import settings
+from app.passages import PassageIndex
+
+_NOTION = Path(__file__).parent.parent / "data" / "mock_notion.json"
+_EXPECTED = "MVP Login & Authentication Specs"
+
+# Other pages, so the login spec has to win rather than be the only hit
+_DISTRACTORS = [
+    ("Billing Overview", "Invoices are sent monthly through Stripe webhooks."),
+    ("Onboarding Checklist", "New hires get laptop access and a buddy."),
+    ("Incident Runbook", "Page the on-call engineer and open a status update."),
+    ("Design Review Process", "Mockups are reviewed weekly with product."),
+]
+
+QUESTIONS = [
+    "how do users sign in",
+    "what is the sign-in plan",
+    "How does sign-in work now?",
+    "what credentials do people log on with",
+    "sign-in",
+]
+
+
+def _build() -> tuple[PassageIndex, list[str]]:
+    docs = json.loads(_NOTION.read_text())["docs"]
+    pages = [(d["title"], d["content"]) for d in docs] + _DISTRACTORS
+    index = PassageIndex(
+        settings.PASSAGE_MAX_TOKENS,
+        dense.DenseIndex(settings.DENSE_DIM),
+        settings.DENSE_MIN_SCORE,
+    )
+    for doc_id, (title, content) in enumerate(pages):
+        index.add(doc_id, content, title)
+    for doc_id, (title, content) in enumerate(pages):
+        index.embed(doc_id, content, title)
+    return index, [title for title, _ in pages]
+
+
+def main() -> None:
+    if not dense.AVAILABLE:
+        sys.exit("numpy is required (pip install '.[dense]')")
+    index, titles = _build()
+    misses = 0
+    for question in QUESTIONS:
+        hits = index.search(question, 1)
+        top = titles[hits[0].doc_id] if hits else None
+        ok = top == _EXPECTED
+        misses += not ok
+        print(f"{'ok  ' if ok else 'MISS'} {question!r} -> {top}")
+    if misses:
+        sys.exit(f"{misses} of {len(QUESTIONS)} paraphrases missed {_EXPECTED!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+"""Retrieval micro-benchmarks for the Notion/Slack tool layer.
+
+For each source, corpus size and retrieval strategy this measures:
+
+- ``ingest_s``   — streaming the export into the memory-mapped store
+- ``build_s``    — building the strategy's index over the store
+- ``memory_bytes`` / ``peak_bytes`` — heap retained by / peak during the
+  build (``tracemalloc``; skipped with ``--no-memory``)
+- ``query_*_ms`` — per-query latency over a fixed, seeded query set
+
+Results are written as JSON. ``--compare`` diffs a run against an earlier
+results file and exits non-zero when any metric regressed by more than
+``--threshold``::
+
+    python -m benchmarks.retrieval --sizes 1k,10k,100k --output base.json
+    python -m benchmarks.retrieval --sizes 1k,10k,100k --compare base.json
+"""
+
+import argparse
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from app import dense
+from app.config import settings
+from app.index import InvertedIndex
+from app.passages import PassageIndex
+from app.store import DocumentStore, build_store, iter_records
+
+from .corpus import SOURCES, generate, queries
+
+_DEFAULT_DATA_DIR = Path(__file__).parent / ".data"
+_TOP_K = 3
+
+TextFn = Callable[[dict[str, Any]], str]
+
+
+# ---------------------------------------------------------------------------
+# Strategies
+# ---------------------------------------------------------------------------
+
+
+class Strategy:
+    """A way of answering a tool query over a :class:`DocumentStore`."""
+
+    name = ""
+
+    def build(self, store: DocumentStore, text: TextFn) -> None:
+        raise NotImplementedError
+
+    def search(self, query: str, k: int) -> list[int]:
+        raise NotImplementedError
+
+
+class LinearScan(Strategy):
+    """The original tool behaviour: first records containing any keyword."""
+
+    name = "linear"
+
+    def build(self, store: DocumentStore, text: TextFn) -> None:
+        self._store, self._text = store, text
+
+    def search(self, query: str, k: int) -> list[int]:
+        keywords = query.lower().split()
+        hits = []
+        for i, record in enumerate(self._store):
+            haystack = self._text(record).lower()
+            if any(kw in haystack for kw in keywords):
+                hits.append(i)
+                if len(hits) == k:
+                    break
+        return hits
+
+
+class BM25(Strategy):
+    """:class:`app.index.InvertedIndex` over whole records."""
+
+    name = "bm25"
+
+    def build(self, store: DocumentStore, text: TextFn) -> None:
+        self._index = InvertedIndex()
+        for i, record in enumerate(store):
+            self._index.add(i, text(record))
+
+    def search(self, query: str, k: int) -> list[int]:
+        return [doc_id for doc_id, _ in self._index.search(query, k)]
+
+
+class Passages(Strategy):
+    """:class:`app.passages.PassageIndex` — BM25 over chunked passages."""
+
+    name = "passages"
+
+    def build(self, store: DocumentStore, text: TextFn) -> None:
+        self._index = PassageIndex(settings.PASSAGE_MAX_TOKENS)
+        for i, record in enumerate(store):
+            self._index.add(i, text(record))
+
+    def search(self, query: str, k: int) -> list[int]:
+        return [passage.doc_id for passage in self._index.search(query, k)]
+
+
+class Hybrid(Passages):
+    """Passages plus hashed TF-IDF vectors, rankings fused (needs numpy)."""
+
+    name = "hybrid"
+
+    def build(self, store: DocumentStore, text: TextFn) -> None:
+        self._index = PassageIndex(
+            settings.PASSAGE_MAX_TOKENS,
+            dense.DenseIndex(settings.DENSE_DIM),
+            settings.DENSE_MIN_SCORE,
+        )
+        for i, record in enumerate(store):
+            self._index.add(i, text(record))
+        for i, record in enumerate(store):
+            self._index.embed(i, text(record))
+
+
+STRATEGIES: dict[str, type[Strategy]] = {
+    s.name: s
+    for s in (LinearScan, BM25, Passages, Hybrid)
+    if s is not Hybrid or dense.AVAILABLE
+}
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+
+def _build_memory(
+    strategy_cls: type[Strategy], store: DocumentStore, text: TextFn
+) -> tuple[int, int]:
+    """Heap bytes retained by, and peak during, a fresh build."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        strategy = strategy_cls()
+        strategy.build(store, text)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del strategy
+    return current - base, peak - base
+
+
+def _query_latencies(strategy: Strategy, query_set: list[str]) -> list[float]:
+    strategy.search(query_set[0], _TOP_K)  # warm-up
+    latencies = []
+    for query in query_set:
+        start = time.perf_counter()
+        strategy.search(query, _TOP_K)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def bench(
+    source: str,
+    records: int,
+    strategy_names: list[str],
+    data_dir: Path,
+    n_queries: int,
+    measure_memory: bool,
+    linear_max_records: int,
+) -> list[dict[str, Any]]:
+    collection, text = SOURCES[source]
+    export = generate(source, records, data_dir)
+
+    store_dir = data_dir / "store" / f"{source}-{records}"
+    start = time.perf_counter()
+    build_store(store_dir, iter_records(export, collection))
+    ingest_s = time.perf_counter() - start
+    store = DocumentStore(store_dir)
+    query_set = queries(n_queries)
+
+    results = []
+    for name in strategy_names:
+        if name == LinearScan.name and records > linear_max_records:
+            continue
+        strategy = STRATEGIES[name]()
+        start = time.perf_counter()
+        strategy.build(store, text)
+        build_s = time.perf_counter() - start
+
+        latencies = _query_latencies(strategy, query_set)
+        result: dict[str, Any] = {
+            "source": source,
+            "records": records,
+            "strategy": name,
+            "ingest_s": round(ingest_s, 4),
+            "build_s": round(build_s, 4),
+            "query_mean_ms": round(statistics.fmean(latencies) * 1000, 4),
+            "query_p50_ms": round(_percentile(latencies, 50) * 1000, 4),
+            "query_p99_ms": round(_percentile(latencies, 99) * 1000, 4),
+        }
+        del strategy
+        if measure_memory:
+            retained, peak = _build_memory(STRATEGIES[name], store, text)
+            result["memory_bytes"] = retained
+            result["peak_bytes"] = peak
+        results.append(result)
+        print(json.dumps(result), file=sys.stderr)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Regression check
+# ---------------------------------------------------------------------------
+
+# Metrics where larger is worse; ingest is excluded (it is disk-bound)
+_COMPARED = (
+    "build_s",
+    "query_p50_ms",
+    "query_p99_ms",
+    "memory_bytes",
+)
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float
+) -> list[str]:
+    """Describe every metric that got worse than *baseline* by > *threshold*."""
+
+    def keyed(run: dict[str, Any]) -> dict[tuple, dict[str, Any]]:
+        return {(r["source"], r["records"], r["strategy"]): r for r in run["results"]}
+
+    old = keyed(baseline)
+    regressions = []
+    for key, new in keyed(current).items():
+        if key not in old:
+            continue
+        for metric in _COMPARED:
+            before, after = old[key].get(metric), new.get(metric)
+            if not before or after is None:
+                continue
+            ratio = after / before
+            line = (
+                f"{'/'.join(map(str, key))} {metric}: {before} → {after} ({ratio:.2f}x)"
+            )
+            print(line, file=sys.stderr)
+            if ratio > 1 + threshold:
+                regressions.append(line)
+    return regressions
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _parse_size(value: str) -> int:
+    suffixes = {"k": 1_000, "m": 1_000_000}
+    value = value.strip().lower()
+    if value[-1:] in suffixes:
+        return int(float(value[:-1]) * suffixes[value[-1]])
+    return int(value)
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        )
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.retrieval", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument(
+        "--sizes", default="1k,10k,100k", help="comma-separated, e.g. 1k,1m,10m"
+    )
+    parser.add_argument("--sources", default=",".join(SOURCES))
+    parser.add_argument("--strategies", default=",".join(STRATEGIES))
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip the tracemalloc build pass"
+    )
+    parser.add_argument(
+        "--linear-max-records",
+        type=_parse_size,
+        default=100_000,
+        help="skip the linear scan above this size (it reads every record)",
+    )
+    parser.add_argument("--data-dir", type=Path, default=_DEFAULT_DATA_DIR)
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--compare", type=Path, help="baseline results JSON")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    strategies = args.strategies.split(",")
+    unknown = set(strategies) - set(STRATEGIES)
+    if unknown:
+        parser.error(f"unknown strategies: {', '.join(sorted(unknown))}")
+
+    results = []
+    for records in map(_parse_size, args.sizes.split(",")):
+        for source in args.sources.split(","):
+            results += bench(
+                source,
+                records,
+                strategies,
+                args.data_dir,
+                args.queries,
+                not args.no_memory,
+                args.linear_max_records,
+            )
+
+    run = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    output = json.dumps(run, indent=2)
+    if args.output:
+        args.output.write_text(output)
+    else:
+        print(output)
+
+    if args.compare:
+        regressions = compare(json.loads(args.compare.read_text()), run, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s):", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""Offline load testing for the chat backend.
+
+``python -m loadtest`` starts :mod:`loadtest.fake_mistral` and the backend
+(pointed at it), drives ``POST /chat`` at a configurable concurrency, and
+reports throughput, time to first token and end-to-end latency for Path A
+and Path B turns. No Mistral API key or network access is needed.
+"""
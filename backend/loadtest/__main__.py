@@ -0,0 +1,340 @@
+"""Drive ``POST /chat`` against a backend wired to the fake Mistral server.
+
+Examples::
+
+    python -m loadtest --concurrency 32 --conversations 200
+    python -m loadtest --workers 4 --token-rate 120 --json results.json
+    python -m loadtest --target http://localhost:8000   # existing backend
+
+Each conversation is an opening question (new session) followed by
+``--follow-ups`` follow-up turns in the same session. Turns are reported as
+Path B when the backend emitted a ``handoff`` (i.e. retrieved), else Path A;
+turns refused by admission control (HTTP 429) are counted as rejected.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from .fake_mistral import add_arguments
+
+_BACKEND_DIR = Path(__file__).parent.parent
+
+
+@dataclass
+class TurnResult:
+    path: str  # "A" or "B"
+    ok: bool
+    latency: float  # request sent → "done" event (s)
+    ttft: float | None  # request sent → first "token" event (s)
+    error: str = ""
+
+
+_REJECTED = "429 Too Many Requests"
+
+
+# ---------------------------------------------------------------------------
+# Process management
+# ---------------------------------------------------------------------------
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _spawn(args: list[str], env: dict[str, str], verbose: bool) -> subprocess.Popen:
+    output = None if verbose else subprocess.DEVNULL
+    return subprocess.Popen(
+        [sys.executable, *args],
+        cwd=_BACKEND_DIR,
+        env={**os.environ, **env},
+        stdout=output,
+        stderr=output,
+    )
+
+
+async def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError(f"{url}: process exited with {proc.returncode}")
+            try:
+                response = await client.get(url, timeout=1.0)
+                if response.status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url}: not ready after {timeout:.0f}s")
+
+
+# ---------------------------------------------------------------------------
+# Load driver
+# ---------------------------------------------------------------------------
+
+
+async def _chat(
+    client: httpx.AsyncClient, base_url: str, session_id: str, message: str
+) -> TurnResult:
+    start = time.perf_counter()
+    ttft: float | None = None
+    event = ""
+    path = "A"
+    try:
+        async with client.stream(
+            "POST",
+            f"{base_url}/chat",
+            json={"session_id": session_id, "message": message},
+        ) as response:
+            if response.status_code == 429:
+                return TurnResult("-", False, 0.0, None, _REJECTED)
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:"):
+                    if event == "handoff":
+                        path = "B"
+                    elif event == "token" and ttft is None:
+                        ttft = time.perf_counter() - start
+                    elif event == "error":
+                        error = json.loads(line[5:]).get("message", "")
+                        return TurnResult(path, False, 0.0, ttft, error)
+                    elif event == "done":
+                        break
+    except httpx.HTTPError as exc:
+        return TurnResult(path, False, 0.0, ttft, f"{type(exc).__name__}: {exc}")
+    return TurnResult(path, True, time.perf_counter() - start, ttft)
+
+
+async def run_load(
+    base_url: str,
+    concurrency: int,
+    conversations: int,
+    follow_ups: int,
+    distinct_questions: int,
+) -> tuple[list[TurnResult], float]:
+    """Run *conversations* conversations, *concurrency* at a time.
+
+    Returns every turn's result and the wall-clock duration. With
+    *distinct_questions* > 0 the opening questions repeat from a pool of that
+    size (exercising the synthesis cache and request coalescing); otherwise
+    every opening question is unique.
+    """
+    results: list[TurnResult] = []
+    pending: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(conversations):
+        pending.put_nowait(i)
+    run_id = os.urandom(4).hex()
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        while not pending.empty():
+            i = pending.get_nowait()
+            session_id = f"loadtest-{run_id}-{i}"
+            n = i % distinct_questions if distinct_questions else i
+            question = f"What is the current status of the login spec for team {n}?"
+            results.append(await _chat(client, base_url, session_id, question))
+            for j in range(follow_ups):
+                follow_up = f"Can you expand on point {j + 1} of that answer?"
+                results.append(await _chat(client, base_url, session_id, follow_up))
+
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    timeout = httpx.Timeout(300.0, connect=10.0)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+
+def _percentile(values: list[float], p: float) -> float | None:
+    """Nearest-rank percentile (``None`` for an empty sample)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def summarize(results: list[TurnResult], elapsed: float) -> dict[str, Any]:
+    summary: dict[str, Any] = {"duration_s": round(elapsed, 3), "paths": {}}
+    for path in ("A", "B", "all"):
+        turns = [r for r in results if path == "all" or r.path == path]
+        ok = [r for r in turns if r.ok]
+        rejected = sum(r.error == _REJECTED for r in turns)
+        latencies = [r.latency for r in ok]
+        ttfts = [r.ttft for r in ok if r.ttft is not None]
+        stats: dict[str, Any] = {
+            "turns": len(turns),
+            "errors": len(turns) - len(ok) - rejected,
+            "rejected": rejected,
+            "throughput_rps": round(len(ok) / elapsed, 3) if elapsed else 0.0,
+        }
+        for name, values in (("ttft", ttfts), ("latency", latencies)):
+            for p in (50, 99):
+                value = _percentile(values, p)
+                stats[f"{name}_p{p}_ms"] = (
+                    None if value is None else round(value * 1000, 1)
+                )
+        summary["paths"][path] = stats
+    errors = sorted({r.error for r in results if not r.ok and r.error != _REJECTED})
+    if errors:
+        summary["sample_errors"] = errors[:5]
+    return summary
+
+
+def _print_report(summary: dict[str, Any]) -> None:
+    columns = (
+        "turns",
+        "errors",
+        "rejected",
+        "throughput_rps",
+        "ttft_p50_ms",
+        "ttft_p99_ms",
+        "latency_p50_ms",
+        "latency_p99_ms",
+    )
+    print(f"\nDuration: {summary['duration_s']:.1f}s")
+    print(f"{'path':<6}" + "".join(f"{c:>16}" for c in columns))
+    for path, stats in summary["paths"].items():
+        cells = ("-" if stats[c] is None else stats[c] for c in columns)
+        print(f"{path:<6}" + "".join(f"{c:>16}" for c in cells))
+    for error in summary.get("sample_errors", []):
+        print(f"error: {error}")
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+async def _main(args: argparse.Namespace) -> dict[str, Any]:
+    procs: list[subprocess.Popen] = []
+    try:
+        base_url = args.target
+        if base_url is None:
+            fake_port, app_port = _free_port(), _free_port()
+            fake_args = [
+                "--first-token-ms", str(args.first_token_ms),
+                "--token-rate", str(args.token_rate),
+                "--reply-tokens", str(args.reply_tokens),
+                "--jitter", str(args.jitter),
+            ]  # fmt: skip
+            if args.no_tool_calls:
+                fake_args.append("--no-tool-calls")
+            fake = _spawn(
+                ["-m", "loadtest.fake_mistral", "--port", str(fake_port), *fake_args],
+                {},
+                args.verbose,
+            )
+            procs.append(fake)
+            await _wait_ready(f"http://127.0.0.1:{fake_port}/docs", fake)
+
+            tmp = tempfile.mkdtemp(prefix="loadtest-")
+            env = {
+                "MISTRAL_API_KEY": "loadtest",
+                "MISTRAL_SERVER_URL": f"http://127.0.0.1:{fake_port}",
+                "AGENT_IDS_FILE": os.path.join(tmp, "agent_ids.json"),
+            }
+            if args.workers > 1 and "STORAGE_BACKEND" not in os.environ:
+                # Follow-ups must see their session on whichever worker they hit
+                env["STORAGE_BACKEND"] = "sqlite"
+                env["STORAGE_SQLITE_PATH"] = os.path.join(tmp, "state.db")
+            if args.workers > 1:
+                # Create the agents once so workers don't race on the IDs file
+                setup = _spawn(
+                    [
+                        "-c",
+                        "import asyncio, app.agents as a; asyncio.run(a.setup_agents())",
+                    ],
+                    env,
+                    args.verbose,
+                )
+                if setup.wait() != 0:
+                    raise RuntimeError("agent setup against the fake server failed")
+            app = _spawn(
+                [
+                    "-m", "uvicorn", "app.main:app",
+                    "--port", str(app_port),
+                    "--workers", str(args.workers),
+                    "--log-level", "warning",
+                ],
+                env,
+                args.verbose,
+            )  # fmt: skip
+            procs.append(app)
+            base_url = f"http://127.0.0.1:{app_port}"
+            await _wait_ready(f"{base_url}/ready", app)
+
+        print(
+            f"Driving {base_url}: {args.conversations} conversations "
+            f"x (1 + {args.follow_ups}) turns, concurrency {args.concurrency}"
+        )
+        results, elapsed = await run_load(
+            base_url,
+            args.concurrency,
+            args.conversations,
+            args.follow_ups,
+            args.distinct_questions,
+        )
+        return summarize(results, elapsed)
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m loadtest", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--conversations", type=int, default=100)
+    parser.add_argument(
+        "--follow-ups", type=int, default=1, help="Path A turns per conversation"
+    )
+    parser.add_argument(
+        "--distinct-questions",
+        type=int,
+        default=0,
+        help="size of the opening-question pool (0 = all unique)",
+    )
+    parser.add_argument(
+        "--target", help="base URL of a running backend (skips spawning)"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--json", type=Path, help="also write the summary here")
+    parser.add_argument("--verbose", action="store_true", help="show server logs")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    summary = asyncio.run(_main(args))
+    _print_report(summary)
+    if args.json:
+        args.json.write_text(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
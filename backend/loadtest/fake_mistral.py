@@ -0,0 +1,273 @@
+"""Local stand-in for the parts of the Mistral API the backend uses.
+
+Implements ``POST /v1/agents/completions`` (streamed and not) and the beta
+agents CRUD (``POST /v1/agents``, ``GET``/``PATCH /v1/agents/{id}``), with
+configurable latency, token rate and tool-call behaviour. Point the backend
+at it with ``MISTRAL_SERVER_URL``.
+
+Run standalone::
+
+    python -m loadtest.fake_mistral --port 8900 --token-rate 80
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+_MODEL = "mistral-medium-latest"
+
+
+@dataclass
+class FakeConfig:
+    """Behaviour of the fake server."""
+
+    # Delay before the first streamed token (or the whole non-streamed reply)
+    first_token_ms: float = 300.0
+    # Streamed tokens per second after the first one
+    tokens_per_second: float = 60.0
+    # Length of every text reply, in tokens
+    reply_tokens: int = 80
+    # The Scavenger answers its first turn with calls to all of its tools
+    tool_calls: bool = True
+    # Each delay is scaled by a uniform factor in [1 - jitter, 1 + jitter]
+    jitter: float = 0.1
+
+
+# ---------------------------------------------------------------------------
+# Response builders
+# ---------------------------------------------------------------------------
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _agent_json(agent_id: str, body: dict[str, Any]) -> dict[str, Any]:
+    now = _now()
+    return {
+        "id": agent_id,
+        "object": "agent",
+        "model": body.get("model", _MODEL),
+        "name": body.get("name", ""),
+        "instructions": body.get("instructions"),
+        "tools": body.get("tools") or [],
+        "handoffs": body.get("handoffs"),
+        "version": 0,
+        "versions": [0],
+        "created_at": now,
+        "updated_at": now,
+        "deployment_chat": False,
+        "source": "api",
+    }
+
+
+def _usage(prompt_tokens: int, completion_tokens: int) -> dict[str, int]:
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def _prompt_tokens(messages: list[dict[str, Any]]) -> int:
+    return sum(len(str(m.get("content") or "")) for m in messages) // 4 + 1
+
+
+def _reply_tokens(n: int) -> list[str]:
+    words = ("the", "login", "spec", "changed", "after", "review", "and", "now")
+    return [f"{words[i % len(words)]} " for i in range(n)]
+
+
+# ---------------------------------------------------------------------------
+# App
+# ---------------------------------------------------------------------------
+
+
+def create_app(config: FakeConfig) -> FastAPI:
+    app = FastAPI(title="Fake Mistral API")
+    agents: dict[str, dict[str, Any]] = {}
+
+    def delay(ms: float) -> float:
+        factor = 1 + random.uniform(-config.jitter, config.jitter)
+        return max(0.0, ms * factor / 1000)
+
+    def tool_calls_for(agent: dict[str, Any] | None, messages: list[dict]) -> list:
+        """Scavenger's first turn: call every tool with the user's question."""
+        if not (config.tool_calls and agent and agent["tools"]):
+            return []
+        if not messages or messages[-1].get("role") != "user":
+            return []
+        arguments = json.dumps({"query": messages[-1].get("content", "")})
+        return [
+            {
+                "id": uuid.uuid4().hex[:9],
+                "type": "function",
+                "function": {"name": tool["function"]["name"], "arguments": arguments},
+                "index": i,
+            }
+            for i, tool in enumerate(agent["tools"])
+        ]
+
+    # -- Beta agents ---------------------------------------------------------
+
+    @app.post("/v1/agents")
+    async def create_agent(request: Request) -> dict[str, Any]:
+        body = await request.json()
+        agent_id = f"ag_{uuid.uuid4().hex}"
+        agents[agent_id] = _agent_json(agent_id, body)
+        return agents[agent_id]
+
+    @app.get("/v1/agents/{agent_id}")
+    async def get_agent(agent_id: str) -> dict[str, Any]:
+        if agent_id not in agents:
+            raise HTTPException(status_code=404, detail="Agent not found")
+        return agents[agent_id]
+
+    @app.patch("/v1/agents/{agent_id}")
+    async def update_agent(agent_id: str, request: Request) -> dict[str, Any]:
+        if agent_id not in agents:
+            raise HTTPException(status_code=404, detail="Agent not found")
+        body = await request.json()
+        agent = agents[agent_id]
+        agent.update({k: v for k, v in body.items() if v is not None})
+        agent["version"] += 1
+        agent["versions"].append(agent["version"])
+        agent["updated_at"] = _now()
+        return agent
+
+    # -- Completions ---------------------------------------------------------
+
+    @app.post("/v1/agents/completions")
+    async def complete(request: Request) -> Any:
+        body = await request.json()
+        agent = agents.get(body.get("agent_id", ""))
+        messages = body.get("messages") or []
+        calls = tool_calls_for(agent, messages)
+        tokens = [] if calls else _reply_tokens(config.reply_tokens)
+        prompt_tokens = _prompt_tokens(messages)
+        completion_id = uuid.uuid4().hex
+
+        if body.get("stream"):
+            return StreamingResponse(
+                _stream(completion_id, calls, tokens, prompt_tokens),
+                media_type="text/event-stream",
+            )
+
+        await asyncio.sleep(
+            delay(config.first_token_ms)
+            + delay(1000 * len(tokens) / config.tokens_per_second)
+        )
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "model": _MODEL,
+            "created": int(time.time()),
+            "usage": _usage(prompt_tokens, len(tokens)),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {
+                        "role": "assistant",
+                        "content": "".join(tokens),
+                        "tool_calls": calls or None,
+                    },
+                    "finish_reason": "tool_calls" if calls else "stop",
+                }
+            ],
+        }
+
+    async def _stream(
+        completion_id: str, calls: list, tokens: list[str], prompt_tokens: int
+    ) -> AsyncIterator[str]:
+        def chunk(delta: dict[str, Any], finish_reason: str | None = None) -> str:
+            data: dict[str, Any] = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "model": _MODEL,
+                "created": int(time.time()),
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+            if finish_reason:
+                data["usage"] = _usage(prompt_tokens, len(tokens))
+            return f"data: {json.dumps(data)}\n\n"
+
+        yield chunk({"role": "assistant", "content": ""})
+        await asyncio.sleep(delay(config.first_token_ms))
+
+        if calls:
+            yield chunk({"content": "", "tool_calls": calls}, "tool_calls")
+        else:
+            interval = 1000 / config.tokens_per_second
+            for i, token in enumerate(tokens):
+                if i:
+                    await asyncio.sleep(delay(interval))
+                yield chunk({"content": token})
+            yield chunk({"content": ""}, "stop")
+        yield "data: [DONE]\n\n"
+
+    return app
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the :class:`FakeConfig` options on *parser*."""
+    defaults = FakeConfig()
+    parser.add_argument("--first-token-ms", type=float, default=defaults.first_token_ms)
+    parser.add_argument(
+        "--token-rate",
+        type=float,
+        default=defaults.tokens_per_second,
+        help="streamed tokens per second",
+    )
+    parser.add_argument("--reply-tokens", type=int, default=defaults.reply_tokens)
+    parser.add_argument(
+        "--no-tool-calls",
+        action="store_true",
+        help="Scavenger replies with text instead of calling its tools",
+    )
+    parser.add_argument("--jitter", type=float, default=defaults.jitter)
+
+
+def config_from_args(args: argparse.Namespace) -> FakeConfig:
+    return FakeConfig(
+        first_token_ms=args.first_token_ms,
+        tokens_per_second=args.token_rate,
+        reply_tokens=args.reply_tokens,
+        tool_calls=not args.no_tool_calls,
+        jitter=args.jitter,
+    )
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(config_from_args(args)),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ function App() {
     messages,
     isStreaming,
     sendMessage,
+    prefetch,
     newSession,
     selectSession,
   } = useChat();
@@ -29,6 +30,7 @@ function App() {
         messages={messages}
         isStreaming={isStreaming}
         onSend={sendMessage}
+        onDraft={prefetch}
       />
     </div>
   );
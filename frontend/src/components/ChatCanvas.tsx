@@ -6,6 +6,7 @@ interface ChatCanvasProps {
   messages: Message[];
   isStreaming: boolean;
   onSend: (text: string) => void;
+  onDraft?: (text: string) => void;
 }
 
 const SUGGESTION_PROMPTS = [
@@ -14,7 +15,12 @@ const SUGGESTION_PROMPTS = [
   "Summarize the latest engineering Slack thread.",
 ];
 
-export function ChatCanvas({ messages, isStreaming, onSend }: ChatCanvasProps) {
+export function ChatCanvas({
+  messages,
+  isStreaming,
+  onSend,
+  onDraft,
+}: ChatCanvasProps) {
   const hasMessages = messages.length > 0;
 
   return (
@@ -48,7 +54,11 @@ export function ChatCanvas({ messages, isStreaming, onSend }: ChatCanvasProps) {
 
         {/* Centered input */}
         <div className="w-full" style={{ maxWidth: "680px" }}>
-          <ChatInput onSend={onSend} disabled={isStreaming} />
+          <ChatInput
+            onSend={onSend}
+            onDraft={onDraft}
+            disabled={isStreaming}
+          />
         </div>
 
         {/* Suggestion pills */}
@@ -96,7 +106,11 @@ export function ChatCanvas({ messages, isStreaming, onSend }: ChatCanvasProps) {
       >
         <MessageList messages={messages} />
         <div className="shrink-0 px-4 pb-5 pt-2 max-w-[800px] mx-auto w-full">
-          <ChatInput onSend={onSend} disabled={isStreaming} />
+          <ChatInput
+            onSend={onSend}
+            onDraft={onDraft}
+            disabled={isStreaming}
+          />
         </div>
       </div>
     </div>
@@ -1,14 +1,33 @@
-import { useRef, useState, useCallback } from "react";
+import { useRef, useState, useCallback, useEffect } from "react";
 import { ArrowUp } from "lucide-react";
 
 interface ChatInputProps {
   onSend: (text: string) => void;
+  /** Called with the draft once typing pauses (used to prefetch retrieval). */
+  onDraft?: (text: string) => void;
   disabled: boolean;
 }
 
-export function ChatInput({ onSend, disabled }: ChatInputProps) {
+// Typing pause after which the draft is reported, and the shortest draft
+// worth reporting
+const DRAFT_DEBOUNCE_MS = 400;
+const MIN_DRAFT_LENGTH = 8;
+
+export function ChatInput({ onSend, onDraft, disabled }: ChatInputProps) {
   const [value, setValue] = useState("");
   const textareaRef = useRef<HTMLTextAreaElement>(null);
+  const lastDraftRef = useRef("");
+
+  useEffect(() => {
+    const draft = value.trim();
+    if (!onDraft || disabled || draft.length < MIN_DRAFT_LENGTH) return;
+    if (draft === lastDraftRef.current) return;
+    const timer = setTimeout(() => {
+      lastDraftRef.current = draft;
+      onDraft(draft);
+    }, DRAFT_DEBOUNCE_MS);
+    return () => clearTimeout(timer);
+  }, [value, onDraft, disabled]);
 
   const resize = useCallback(() => {
     const el = textareaRef.current;
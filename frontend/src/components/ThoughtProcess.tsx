@@ -128,6 +128,41 @@ function ToolResultRow({ tool, result }: { tool: string; result: string }) {
   );
 }
 
+// ── Synthesis row (live, collapsible) ───────────────────────────────────────
+
+function SynthesisRow({ text }: { text: string }) {
+  const [expanded, setExpanded] = useState(false);
+  const PREVIEW_LEN = 240;
+  const isLong = text.length > PREVIEW_LEN;
+  // While collapsed show the tail, so the newest text stays in view
+  const displayed =
+    !isLong || expanded ? text : "…" + text.slice(-PREVIEW_LEN);
+
+  return (
+    <div
+      className="rounded-md px-3 py-2 text-[12px] leading-relaxed"
+      style={{
+        backgroundColor: "rgba(255,255,255,0.04)",
+        border: "1px solid rgba(255,255,255,0.06)",
+        fontFamily: "var(--cc-font-mono)",
+        color: "#A1A1AA",
+      }}
+    >
+      <span className="wrap-break-word whitespace-pre-wrap">{displayed}</span>
+      {isLong && (
+        <button
+          onClick={() => setExpanded((v) => !v)}
+          className="mt-1.5 flex items-center gap-1 text-[11px] transition-colors"
+          style={{ color: "var(--cc-accent)", opacity: 0.8 }}
+        >
+          {expanded ? <ChevronUp size={11} /> : <ChevronDown size={11} />}
+          {expanded ? "show less" : "show all"}
+        </button>
+      )}
+    </div>
+  );
+}
+
 // ── Step renderer ───────────────────────────────────────────────────────────
 
 function StepRow({ step }: { step: ThoughtStep }) {
@@ -183,6 +218,7 @@ function StepRow({ step }: { step: ThoughtStep }) {
             >
               &quot;{step.query}&quot;
             </span>
+            {dateRange(step.since, step.until)}
           </span>
         </div>
       );
@@ -192,7 +228,7 @@ function StepRow({ step }: { step: ThoughtStep }) {
         className="text-[13px]"
         style={{ color: "#D4D4D8", fontFamily: "var(--cc-font-mono)" }}
       >
-        &gt; {step.tool}(&quot;{step.query}&quot;)
+        &gt; {step.tool}(&quot;{step.query}&quot;){dateRange(step.since, step.until)}
       </div>
     );
   }
@@ -202,11 +238,23 @@ function StepRow({ step }: { step: ThoughtStep }) {
     return <ToolResultRow tool={step.tool} result={step.result} />;
   }
 
+  // Synthesizer output, streamed live while the answer is being prepared
+  if (step.type === "synthesis") {
+    return <SynthesisRow text={step.text} />;
+  }
+
   return null;
 }
 
 // ── Helpers ─────────────────────────────────────────────────────────────────
 
+function dateRange(since?: string, until?: string): string {
+  if (since && until) return ` (${since} – ${until})`;
+  if (since) return ` (since ${since})`;
+  if (until) return ` (until ${until})`;
+  return "";
+}
+
 function getStepAgent(step: ThoughtStep): AgentName {
   switch (step.type) {
     case "agent_start":
@@ -215,6 +263,7 @@ function getStepAgent(step: ThoughtStep): AgentName {
       return step.from;
     case "tool_call":
     case "tool_result":
+    case "synthesis":
       return step.agent;
   }
 }
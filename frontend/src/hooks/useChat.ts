@@ -1,4 +1,4 @@
-import { useState, useCallback } from "react";
+import { useState, useCallback, useRef } from "react";
 import { v4 as uuidv4 } from "uuid";
 import type { Message, Session, ThoughtStep, AgentName } from "../types";
 import { saveSessions, loadSessions } from "../lib/storage";
@@ -7,6 +7,12 @@ const API_URL =
   (import.meta.env.VITE_API_URL as string | undefined) ??
   "http://localhost:8080";
 
+// A dropped stream is resumed (Last-Event-ID) this many times before giving up
+const MAX_RESUME_ATTEMPTS = 3;
+const RESUME_DELAY_MS = 500;
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
 // ---------------------------------------------------------------------------
 // SSE payload → ThoughtStep mapper
 // ---------------------------------------------------------------------------
@@ -30,6 +36,8 @@ function toThoughtStep(
         agent: payload.agent as AgentName,
         tool: payload.tool,
         query: payload.query ?? "",
+        since: payload.since,
+        until: payload.until,
       };
     case "tool_result":
       return {
@@ -53,6 +61,9 @@ export function useChat() {
     () => loadSessions()[0]?.id ?? null,
   );
   const [isStreaming, setIsStreaming] = useState(false);
+  // Id the next new session will get, so a draft prefetched before the first
+  // message is sent belongs to the session that message creates
+  const pendingSessionIdRef = useRef<string>(uuidv4());
 
   const activeSession = sessions.find((s) => s.id === activeSessionId) ?? null;
   const messages = activeSession?.messages ?? [];
@@ -92,7 +103,8 @@ export function useChat() {
       // Ensure there is an active session
       let sessionId = activeSessionId;
       if (!sessionId) {
-        sessionId = uuidv4();
+        sessionId = pendingSessionIdRef.current;
+        pendingSessionIdRef.current = uuidv4();
         const session: Session = {
           id: sessionId,
           createdAt: new Date().toISOString(),
@@ -155,13 +167,40 @@ export function useChat() {
         );
       };
 
-      try {
+      // Id of the last event handled; a reconnect sends it to resume the turn
+      let lastEventId = "";
+
+      // One request: resolves once the turn is over, throws if the
+      // connection dropped before "done"
+      const streamTurn = async (): Promise<void> => {
         const response = await fetch(`${API_URL}/chat`, {
           method: "POST",
-          headers: { "Content-Type": "application/json" },
+          headers: {
+            "Content-Type": "application/json",
+            ...(lastEventId ? { "Last-Event-ID": lastEventId } : {}),
+          },
           body: JSON.stringify({ session_id: sid, message: text }),
         });
 
+        if (response.status === 409 && lastEventId) {
+          // The turn cannot be resumed (expired, or buffered by another
+          // server): drop the partial reply and start the turn over
+          lastEventId = "";
+          patchAssistant((m) => ({ ...m, content: "", thoughts: [] }));
+          return streamTurn();
+        }
+        if (response.status === 429) {
+          // Admission control: the backend is at capacity
+          const retryAfter = response.headers.get("Retry-After");
+          patchAssistant((m) => ({
+            ...m,
+            content: `The server is busy right now. Please try again${
+              retryAfter ? ` in ${retryAfter}s` : ""
+            }.`,
+            isStreaming: false,
+          }));
+          return;
+        }
         if (!response.ok || !response.body) {
           throw new Error(`HTTP ${response.status}`);
         }
@@ -169,11 +208,14 @@ export function useChat() {
         const reader = response.body.getReader();
         const decoder = new TextDecoder();
         let buffer = "";
+        let currentEvent = "";
+        let currentData = "";
+        let currentId = "";
 
         // Parse SSE stream manually (fetch-based, no EventSource)
-        outer: while (true) {
+        while (true) {
           const { done, value } = await reader.read();
-          if (done) break;
+          if (done) throw new Error("Stream ended before done");
 
           // Normalize CRLF → LF so blank-line separators are always ""
           buffer += decoder
@@ -183,32 +225,53 @@ export function useChat() {
           const rawLines = buffer.split("\n");
           buffer = rawLines.pop() ?? "";
 
-          let currentEvent = "";
-          let currentData = "";
-
           for (const line of rawLines) {
             if (line.startsWith("event:")) {
               currentEvent = line.slice(6).trim();
             } else if (line.startsWith("data:")) {
               currentData = line.slice(5).trim();
+            } else if (line.startsWith("id:")) {
+              currentId = line.slice(3).trim();
             } else if (line === "") {
               if (!currentEvent) {
                 continue;
               }
+              if (currentId) lastEventId = currentId;
 
               try {
                 const payload = currentData
                   ? (JSON.parse(currentData) as Record<string, string>)
                   : {};
 
-                if (currentEvent === "token") {
+                if (currentEvent === "synthesis_token") {
+                  // Synthesizer progress: grow the trailing synthesis step
+                  const chunk = payload.text ?? "";
+                  patchAssistant((m) => {
+                    const last = m.thoughts[m.thoughts.length - 1];
+                    const thoughts: ThoughtStep[] =
+                      last?.type === "synthesis"
+                        ? [
+                            ...m.thoughts.slice(0, -1),
+                            { ...last, text: last.text + chunk },
+                          ]
+                        : [
+                            ...m.thoughts,
+                            {
+                              type: "synthesis",
+                              agent: "synthesizer",
+                              text: chunk,
+                            },
+                          ];
+                    return { ...m, thoughts };
+                  });
+                } else if (currentEvent === "token") {
                   patchAssistant((m) => ({
                     ...m,
                     content: m.content + (payload.text ?? ""),
                   }));
                 } else if (currentEvent === "done") {
                   patchAssistant((m) => ({ ...m, isStreaming: false }));
-                  break outer;
+                  return;
                 } else {
                   const step = toThoughtStep(currentEvent, payload);
                   if (step) {
@@ -225,9 +288,23 @@ export function useChat() {
               // Reset for next event
               currentEvent = "";
               currentData = "";
+              currentId = "";
             }
           }
         }
+      };
+
+      try {
+        for (let attempt = 0; ; attempt++) {
+          try {
+            await streamTurn();
+            break;
+          } catch (err) {
+            if (!lastEventId || attempt >= MAX_RESUME_ATTEMPTS) throw err;
+            console.warn("Stream dropped, resuming:", err);
+            await sleep(RESUME_DELAY_MS * (attempt + 1));
+          }
+        }
       } catch (err) {
         console.error("Stream error:", err);
         patchAssistant((m) => ({ ...m, isStreaming: false }));
@@ -243,12 +320,30 @@ export function useChat() {
     [activeSessionId, isStreaming],
   );
 
+  // ------------------------------------------------------------------
+  // Prefetch retrieval for a draft (fire-and-forget, best effort)
+  // ------------------------------------------------------------------
+  const prefetch = useCallback(
+    (text: string) => {
+      fetch(`${API_URL}/prefetch`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({
+          session_id: activeSessionId ?? pendingSessionIdRef.current,
+          message: text,
+        }),
+      }).catch(() => {});
+    },
+    [activeSessionId],
+  );
+
   return {
     sessions,
     activeSessionId,
     messages,
     isStreaming,
     sendMessage,
+    prefetch,
     newSession,
     selectSession,
   };
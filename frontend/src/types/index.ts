@@ -2,9 +2,17 @@ export type AgentName = "scavenger" | "synthesizer" | "interface";
 
 export type ThoughtStep =
   | { type: "agent_start"; agent: AgentName }
-  | { type: "tool_call"; agent: AgentName; tool: string; query: string }
+  | {
+      type: "tool_call";
+      agent: AgentName;
+      tool: string;
+      query: string;
+      since?: string;
+      until?: string;
+    }
   | { type: "tool_result"; agent: AgentName; tool: string; result: string }
-  | { type: "handoff"; from: AgentName; to: AgentName };
+  | { type: "handoff"; from: AgentName; to: AgentName }
+  | { type: "synthesis"; agent: AgentName; text: string }; // grows as it streams
 
 export interface Message {
   id: string;